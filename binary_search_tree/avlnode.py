@@ -0,0 +1,14 @@
+"""
+File: avlnode.py
+"""
+
+from binary_search_tree.bstnode import BSTNode
+
+
+class AVLNode(BSTNode):
+    """Represents a node for an AVL tree, which knows the height
+    of its subtree."""
+
+    def __init__(self, data, left = None, right = None):
+        BSTNode.__init__(self, data, left, right)
+        self.height = 1
@@ -10,4 +10,6 @@ class BSTNode(object):
         self.data = data
         self.left = left
         self.right = right
+        # Number of nodes in the subtree of this node
+        self.size = 1
 
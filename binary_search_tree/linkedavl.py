@@ -0,0 +1,144 @@
+"""
+File: linkedavl.py
+
+A self-balancing AVL variant of the link-based binary search tree.
+"""
+
+from binary_search_tree.avlnode import AVLNode
+from binary_search_tree.linkedbst import LinkedBST, _sizeOf
+
+
+def _height(node):
+    """Returns the height of the subtree, 0 for an empty one."""
+    return node.height if node != None else 0
+
+
+def _updateNode(node):
+    """Recomputes the height and the size of node from its children."""
+    node.height = max(_height(node.left), _height(node.right)) + 1
+    node.size = _sizeOf(node.left) + _sizeOf(node.right) + 1
+
+
+def _rotateLeft(top):
+    """Rotates the subtree to the left, returns the new top."""
+    newTop = top.right
+    top.right = newTop.left
+    newTop.left = top
+    _updateNode(top)
+    _updateNode(newTop)
+    return newTop
+
+
+def _rotateRight(top):
+    """Rotates the subtree to the right, returns the new top."""
+    newTop = top.left
+    top.left = newTop.right
+    newTop.right = top
+    _updateNode(top)
+    _updateNode(newTop)
+    return newTop
+
+
+def _balance(node):
+    """Restores the AVL property of node, whose subtrees are
+    AVL trees, and returns the new top of the subtree."""
+    _updateNode(node)
+    factor = _height(node.left) - _height(node.right)
+    if factor > 1:
+        if _height(node.left.left) < _height(node.left.right):
+            node.left = _rotateLeft(node.left)
+        return _rotateRight(node)
+    if factor < -1:
+        if _height(node.right.right) < _height(node.right.left):
+            node.right = _rotateRight(node.right)
+        return _rotateLeft(node)
+    return node
+
+
+class LinkedAVL(LinkedBST):
+    """A link-based AVL tree implementation. The heights of the two
+    subtrees of every node differ at most by one, so the height
+    of the tree is O(log n) for any order of insertions and removals."""
+
+    _nodeType = AVLNode
+
+    def _update(self, node):
+        '''
+        Updates the height and the size of node after rebuilding
+        the tree.
+        node: node whose children have changed
+        '''
+        _updateNode(node)
+
+    def _retrace(self, path):
+        """Rebalances the nodes of path from the bottom to the root.
+        path: nodes from the root to the changed subtree"""
+        for index in range(len(path) - 1, -1, -1):
+            node = path[index]
+            top = _balance(node)
+            if top is node:
+                continue
+            if index == 0:
+                self._root = top
+            elif path[index - 1].left is node:
+                path[index - 1].left = top
+            else:
+                path[index - 1].right = top
+
+    # Mutator methods
+    def add(self, item):
+        """Adds item to the tree."""
+        self._size += 1
+        if self._root == None:
+            self._root = AVLNode(item)
+            return
+
+        # Equal items go right, as in LinkedBST
+        path = []
+        node = self._root
+        while node != None:
+            path.append(node)
+            node = node.left if item < node.data else node.right
+        parent = path[-1]
+        if item < parent.data:
+            parent.left = AVLNode(item)
+        else:
+            parent.right = AVLNode(item)
+        self._retrace(path)
+
+    def remove(self, item):
+        """Precondition: item is in self.
+        Raises: KeyError if item is not in self.
+        postcondition: item is removed from self."""
+        path = []
+        node = self._root
+        while node != None and node.data != item:
+            path.append(node)
+            node = node.left if node.data > item else node.right
+        if node == None:
+            raise KeyError("Item not in tree.")
+        itemRemoved = node.data
+
+        # The node with two children takes the maximum of its left
+        # subtree, the node of that maximum is removed instead
+        if node.left != None and node.right != None:
+            path.append(node)
+            target = node.left
+            while target.right != None:
+                path.append(target)
+                target = target.right
+            node.data = target.data
+            newChild = target.left
+        else:
+            target = node
+            newChild = node.left if node.left != None else node.right
+
+        if not path:
+            self._root = newChild
+        elif path[-1].left is target:
+            path[-1].left = newChild
+        else:
+            path[-1].right = newChild
+        self._size -= 1
+        self._retrace(path)
+        return itemRemoved
@@ -9,15 +9,49 @@ from binary_search_tree.linkedstack import LinkedStack
 from binary_search_tree.linkedqueue import LinkedQueue
 
 
+def _sizeOf(node):
+    """Returns the number of nodes in the subtree, 0 for an empty one."""
+    return node.size if node != None else 0
+
+
 class LinkedBST(AbstractCollection):
     """An link-based binary search tree implementation."""
 
+    # Type of the nodes created by bulkLoad
+    _nodeType = BSTNode
+
     def __init__(self, sourceCollection=None):
         """Sets the initial state of self, which includes the
         contents of sourceCollection, if it's present."""
         self._root = None
         AbstractCollection.__init__(self, sourceCollection)
 
+    @classmethod
+    def bulkLoad(cls, sourceCollection, isSorted=None):
+        """Returns a new balanced tree with the contents of
+        sourceCollection, built in O(n) without descents.
+        isSorted: True if the items are known to be sorted, False
+        if they are not, None to check it during the load.
+        Unsorted items are sorted once before the load."""
+        items = list(sourceCollection)
+        if isSorted is None:
+            isSorted = all(items[index] <= items[index + 1]
+                           for index in range(len(items) - 1))
+        if not isSorted:
+            items.sort()
+
+        # Linking the items into a vine in sorted order
+        preRoot = cls._nodeType(None)
+        tail = preRoot
+        for item in items:
+            tail.right = cls._nodeType(item)
+            tail = tail.right
+
+        tree = cls()
+        tree._root = tree._buildFromVine(preRoot.right, len(items))
+        tree._size = len(items)
+        return tree
+
     # Accessor methods
     def __str__(self):
         """Returns a string representation with the tree rotated
@@ -113,18 +147,15 @@ class LinkedBST(AbstractCollection):
     def find(self, item):
         """If item matches an item in self, returns the
         matched item, or None otherwise."""
-
-        def recurse(node):
-            if node is None:
-                return None
-            elif item == node.data:
+        node = self._root
+        while node != None:
+            if item == node.data:
                 return node.data
             elif item < node.data:
-                return recurse(node.left)
+                node = node.left
             else:
-                return recurse(node.right)
-
-        return recurse(self._root)
+                node = node.right
+        return None
 
     # Mutator methods
     def clear(self):
@@ -135,28 +166,28 @@ class LinkedBST(AbstractCollection):
     def add(self, item):
         """Adds item to the tree."""
 
-        # Helper function to search for item's position
-        def recurse(node):
-            # New item is less, go left until spot is found
-            if item < node.data:
-                if node.left == None:
-                    node.left = BSTNode(item)
-                else:
-                    recurse(node.left)
-            # New item is greater or equal,
-            # go right until spot is found
-            elif node.right == None:
-                node.right = BSTNode(item)
-            else:
-                recurse(node.right)
-                # End of recurse
-
         # Tree is empty, so new item goes at the root
         if self.isEmpty():
             self._root = BSTNode(item)
         # Otherwise, search for the item's spot
         else:
-            recurse(self._root)
+            node = self._root
+            while True:
+                # Every node on the way gets the new item in its subtree
+                node.size += 1
+                # New item is less, go left until spot is found
+                if item < node.data:
+                    if node.left == None:
+                        node.left = BSTNode(item)
+                        break
+                    node = node.left
+                # New item is greater or equal,
+                # go right until spot is found
+                elif node.right == None:
+                    node.right = BSTNode(item)
+                    break
+                else:
+                    node = node.right
         self._size += 1
 
     def remove(self, item):
@@ -176,6 +207,7 @@ class LinkedBST(AbstractCollection):
             parent = top
             currentNode = top.left
             while not currentNode.right == None:
+                currentNode.size -= 1
                 parent = currentNode
                 currentNode = currentNode.right
             top.data = currentNode.data
@@ -195,6 +227,8 @@ class LinkedBST(AbstractCollection):
         direction = 'L'
         currentNode = self._root
         while not currentNode == None:
+            # The item is in self, so every node on the way loses one
+            currentNode.size -= 1
             if currentNode.data == item:
                 itemRemoved = currentNode.data
                 break
@@ -266,172 +300,209 @@ class LinkedBST(AbstractCollection):
         '''
         if not root:
             root = self._root
-
-        def height1(top):
-            if top and (top.left or top.right):
-                height = height1(top.left)
-                height2 = height1(top.right)
-                return max(height, height2) + 1
-            else:
-                return 0
-
-        return height1(root)
+        if root == None:
+            return 0
+
+        # Counting the levels below the root
+        height = 0
+        level = [root]
+        while True:
+            level = [child for node in level
+                     for child in (node.left, node.right) if child != None]
+            if not level:
+                return height
+            height += 1
 
     def isBalanced(self):
         '''
         return: True if tree is balanced
         '''
-
-        def height1(top):
-            """
-            Helping-function to find a sub-height
-            top: the root of the tree
-            """
-            if top and (top.left or top.right):
-                height = height1(top.left)
-                height2 = height1(top.right)
-                return max(height, height2) + 1
+        # Heights of the visited subtrees, leaves and empty ones have 0
+        heights = {None: 0}
+        stack = [(self._root, False)]
+        while stack:
+            top, visited = stack.pop()
+            if top == None:
+                continue
+            if not visited:
+                stack.append((top, True))
+                stack.append((top.right, False))
+                stack.append((top.left, False))
+                continue
+            h1 = heights[top.left]
+            h2 = heights[top.right]
+            if abs(h1 - h2) > 1:
+                return False
+            if top.left or top.right:
+                heights[top] = max(h1, h2) + 1
             else:
-                return 0
-
-        def balance(top):
-            """
-            Recursive function to find out whether the tree is balanced
-            top: the root
-            """
-            if not top:
-                return True
-            h1 = height1(top.left)
-            h2 = height1(top.right)
-            if abs(h1 - h2) <= 1 and balance(top.left) and \
-                    balance(top.right):
-                return True
-            return False
-
-        return balance(self._root)
+                heights[top] = 0
+        return True
 
     def rangeFind(self, low, high):
         '''
-        Returns a list of the items in the tree, where low <= item <= high."""
+        Returns a list of the items in the tree, where low <= item <= high.
+        Subtrees outside of the range are not visited.
         low: lower limit
         high: higher limit
         return: all values in tree between the low and high
         '''
-
         lst = []
-        for item in self.inorder():
-            if low <= item <= high:
-                lst.append(item)
-            elif item > high:
-                break
+        stack = []
+        node = self._root
+        while stack or node != None:
+            if node != None:
+                # The left subtree has only items less than low
+                if node.data < low:
+                    node = node.right
+                else:
+                    stack.append(node)
+                    node = node.left
+            else:
+                node = stack.pop()
+                if node.data > high:
+                    break
+                lst.append(node.data)
+                node = node.right
         return lst
 
+    def rank(self, item):
+        '''
+        return: the number of items in the tree less than item
+        '''
+        return self._countLess(item, False)
+
+    def select(self, index):
+        '''
+        Finds the item at the position index in sorted order.
+        index: position of the item counting from 0
+        return: the item
+        '''
+        if not 0 <= index < len(self):
+            raise IndexError("Index out of range.")
+        node = self._root
+        while True:
+            left = _sizeOf(node.left)
+            if index < left:
+                node = node.left
+            elif index == left:
+                return node.data
+            else:
+                index -= left + 1
+                node = node.right
+
+    def countRange(self, low, high):
+        '''
+        low: lower limit
+        high: higher limit
+        return: the number of items in the tree, where low <= item <= high
+        '''
+        if low > high:
+            return 0
+        return self._countLess(high, True) - self._countLess(low, False)
+
+    def _countLess(self, item, orEqual):
+        '''
+        Counts the items less than item in one descent.
+        orEqual: True to count the items equal to item too
+        return: the number of items
+        '''
+        count = 0
+        node = self._root
+        while node != None:
+            if node.data < item or orEqual and node.data == item:
+                count += _sizeOf(node.left) + 1
+                node = node.right
+            else:
+                node = node.left
+        return count
+
     def rebalance(self):
         '''
-        Rebalances the tree.
+        Rebalances the tree in O(n) time, the nodes are reused.
         return: None
         '''
-        new = []
-        elements = [i for i in self.inorder()]
-
-        def middle(values):
-            """
-            values: list with values
-            return: middle value in the values
-            """
-            return values[int((len(values) - 1) / 2)]
-
-        def half(values, mid=None):
-            """
-            Separating the list on two halfs
-            values: list with values
-            mid: the separator
-            return: two lists
-            """
-            if not mid:
-                mid = middle(values)
-            p1 = []
-            while values[0] < mid:
-                p1.append(values.pop(0))
-            return p1, values
-
-        root = middle(elements)
-        new = [root]
-        ind = elements.index(root)
-        elements.pop(ind)
-
-        def recurse(values):
-            """
-            Recursive function to balance the tree
-            values: list with tree values
-            """
-            if len(values) > 1:
-                half1, half2 = half(values)
-
-                if half1 and half2:
-                    mid1, mid2 = middle(half1), middle(half2)
-                    el1, el2 = mid1, mid2
-                    in1, in2 = half1.index(el1), half2.index(el2)
-                    new.append(half1.pop(in1))
-                    new.append(half2.pop(in2))
-                    recurse(half1)
-                    recurse(half2)
-
-                elif half1:
-                    el1 = middle(half1)
-                    in1 = half1.index(el1)
-                    new.append(half1.pop(in1))
-                    recurse(half1)
-
-                elif half2:
-                    el1 = middle(half2)
-                    in1 = half2.index(el1)
-                    new.append(half2.pop(in1))
-                    recurse(half2)
-            elif values:
-                new.append(values[0])
-
-        recurse(elements)
-        self._root = BSTNode(new[0])
-        for i in new[1:]:
-            self.add(i)
+        self._root = self._buildFromVine(self._toVine(), self._size)
+
+    def _toVine(self):
+        '''
+        Turns the tree into a vine, where every node has only the
+        right child, by right rotations.
+        return: the first node of the vine
+        '''
+        preRoot = BSTNode(None)
+        preRoot.right = self._root
+        tail = preRoot
+        rest = self._root
+        while rest != None:
+            if rest.left == None:
+                tail = rest
+                rest = rest.right
+            else:
+                top = rest.left
+                rest.left = top.right
+                top.right = rest
+                tail.right = top
+                rest = top
+        return preRoot.right
+
+    def _buildFromVine(self, head, count):
+        '''
+        Builds a perfectly balanced tree from the nodes of the vine,
+        recursion goes only O(log n) deep.
+        head: the first node of the vine
+        count: number of nodes to take from the vine
+        return: the root of the tree
+        '''
+        rest = head
+
+        def recurse(count):
+            nonlocal rest
+            if count == 0:
+                return None
+            left = recurse((count - 1) // 2)
+            node = rest
+            rest = node.right
+            node.left = left
+            node.right = recurse(count - 1 - (count - 1) // 2)
+            self._update(node)
+            return node
+
+        return recurse(count)
+
+    def _update(self, node):
+        '''
+        Updates the size which node keeps about its subtree.
+        node: node whose children have changed
+        '''
+        node.size = _sizeOf(node.left) + _sizeOf(node.right) + 1
 
     def successor(self, item):
         """
         Returns the smallest item that is larger than
         item, or None if there is no such item.
         """
-
-        def recurse(nod):
-            if nod:
-                if nod.data < item:
-                    return recurse(nod.right)
-                elif nod.data > item:
-                    if nod.left and nod.left.data > item:
-                        return recurse(nod.left)
-                    elif nod.left and nod.left.data == item:
-                        return nod.left.data
-                    else:
-                        return nod.data
-
-        return recurse(self._root)
+        result = None
+        node = self._root
+        while node != None:
+            if node.data > item:
+                result = node.data
+                node = node.left
+            else:
+                node = node.right
+        return result
 
     def predecessor(self, item):
         """
         Returns the largest item that is smaller than
         item, or None if there is no such item.
         """
-
-        def recurse(nod):
-            if nod:
-                if nod.data > item:
-                    return recurse(nod.left)
-                elif nod.data < item:
-                    if nod.right and nod.right.data < item:
-                        return recurse(nod.right)
-                    elif nod.right and nod.right.data == item:
-                        return nod.right.data
-                    else:
-                        return nod.data
-
-        return recurse(self._root)
+        result = None
+        node = self._root
+        while node != None:
+            if node.data < item:
+                result = node.data
+                node = node.right
+            else:
+                node = node.left
+        return result
@@ -4,10 +4,101 @@ File: testbst.py
 A tester program for binary search trees.
 """
 
+from binary_search_tree.linkedavl import LinkedAVL
 from binary_search_tree.linkedbst import LinkedBST
 import random
 
 
+def checkNodes(node):
+    """Returns the height of the subtree, or -1 if the sizes kept in
+    the nodes are wrong or the AVL nodes are not balanced."""
+    if node == None:
+        return 0
+    left, right = checkNodes(node.left), checkNodes(node.right)
+    if left < 0 or right < 0:
+        return -1
+    size = 1
+    for child in (node.left, node.right):
+        if child != None:
+            size += child.size
+    height = max(left, right) + 1
+    if node.size != size:
+        return -1
+    if hasattr(node, "height") and \
+            (node.height != height or abs(left - right) > 1):
+        return -1
+    return height
+
+
+def testAVL():
+    print("\n\nAVL tree")
+    tree = LinkedAVL(range(1, 16))
+    print("\nAdded 1..15:\n" + str(tree))
+    print('HEIGHT:', tree.height())
+    print("Expect True for balanced: ", checkNodes(tree._root) > 0)
+
+    # Random insertions and removals, checking every tree on the way
+    balanced = ordered = True
+    for trial in range(100):
+        lyst = list(range(50))
+        random.shuffle(lyst)
+        for cls in (LinkedBST, LinkedAVL):
+            tree = cls(lyst)
+            for item in lyst[:25]:
+                tree.remove(item)
+                balanced = balanced and checkNodes(tree._root) >= 0
+            ordered = ordered and \
+                list(tree.inorder()) == sorted(lyst[25:])
+    print("Expect True for balanced after removals: ", balanced)
+    print("Expect True for ordered after removals: ", ordered)
+
+    tree = LinkedAVL.bulkLoad(range(1, 8))
+    print("\nBulk loaded 1..7:\n" + str(tree))
+    tree.remove(4)
+    print("Removed 4:\n" + str(tree))
+    print("Expect 3 5: ", tree.predecessor(4), tree.successor(4))
+
+
+def testBulkLoad():
+    print("\n\nBulk load")
+    loaded = True
+    for isSorted in (None, True, False):
+        for lyst in (list(range(100)), random.sample(range(100), 100)):
+            if isSorted and lyst != sorted(lyst):
+                continue
+            tree = LinkedBST.bulkLoad(lyst, isSorted)
+            loaded = loaded and tree.isBalanced() and len(tree) == 100 and \
+                list(tree.inorder()) == sorted(lyst)
+    print("Expect True for balanced and ordered: ", loaded)
+
+
+def testDeepChain():
+    print("\n\nDeep chain")
+    tree = LinkedBST(range(3000))
+    print("Expect 2999: ", tree.height())
+    print("Expect 2999 None: ", tree.find(2999), tree.find(3000))
+    print("Expect 1499 1501: ", tree.predecessor(1500), tree.successor(1500))
+    print("Expect False for balanced: ", tree.isBalanced())
+
+
+def testOrderStatistics():
+    print("\n\nOrder statistics")
+    counted = True
+    for trial in range(100):
+        lyst = random.sample(range(100), 50)
+        for cls in (LinkedBST, LinkedAVL):
+            tree = cls(lyst)
+            for item in lyst[:25]:
+                tree.remove(item)
+            rest = sorted(lyst[25:])
+            counted = counted and checkNodes(tree._root) >= 0 and \
+                all(tree.select(index) == item and tree.rank(item) == index
+                    for index, item in enumerate(rest)) and \
+                tree.countRange(20, 60) == len([item for item in rest
+                                                if 20 <= item <= 60])
+    print("Expect True for sizes, rank, select and countRange: ", counted)
+
+
 def main():
     tree = LinkedBST()
     print("Adding D B A C F E G")
@@ -55,12 +146,22 @@ def main():
     print("\nAdded 1..15:\n" + str(tree))
     print('\n\nHEIGHT:', tree.height())
 
+    tree.rebalance()
+    print("\nRebalanced 1..15:\n" + str(tree))
+    print("Expect True for balanced and ordered: ", tree.isBalanced() and
+          list(tree.inorder()) == list(range(1, 16)))
+
     lyst = list(range(1, 16))
 
     random.shuffle(lyst)
     tree = LinkedBST(lyst)
     print("\nAdded ", lyst, "\n" + str(tree))
 
+    testAVL()
+    testBulkLoad()
+    testDeepChain()
+    testOrderStatistics()
+
     lyst = [113, 30, 68, 74, 45, 91, 88]
     random.shuffle(lyst)
     tree = LinkedBST(lyst)
@@ -69,6 +170,7 @@ def main():
     print(tree.rangeFind(30, 91))
     print(tree.successor(20))
     print(tree.predecessor(50))
+    print(tree.rank(74), tree.select(0), tree.countRange(30, 91))
     tree.rebalance()
     print(tree)
     print("\nAdded ", lyst, "\n" + str(tree))
@@ -0,0 +1,166 @@
+# The part of tic-tac-toe game
+# Created to measure the speed of all bots on a fixed set of positions
+# and to compare the results with the saved baseline
+#
+# Example: python -m tic_tac_toe.benchmark --output results.json
+
+import argparse
+import json
+import os
+import random
+import sys
+import tracemalloc
+from time import perf_counter
+
+from tic_tac_toe.board import GameBoard
+from tic_tac_toe.test_game import Play
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__),
+                             'benchmark_baseline.json')
+TOLERANCE = 0.5
+# Absolute growth which is never a regression, small timings are noisy
+SLACK = {'seconds_per_move': 0.001, 'peak_memory': 4096}
+# Bots with a time limit search more positions on faster machines, so
+# only their work per searched position is compared
+PER_NODE_SLACK = {'seconds_per_node': 0.00001, 'memory_per_node': 256}
+REPEATS = 3
+SEED = 2019
+
+# Moves from the start of the game, 'X' moves first, the bot plays the
+# mark of the player to move
+POSITIONS = {
+    'opening_empty': [],
+    'opening_center': [(1, 1)],
+    'opening_corner': [(0, 0)],
+    'midgame': [(1, 1), (0, 0), (2, 2)],
+    'midgame_edges': [(0, 1), (1, 1), (2, 1)],
+    'win_in_one': [(0, 0), (1, 0), (0, 1), (1, 1)],
+    'forced_block': [(1, 1), (0, 0), (2, 2), (0, 2)],
+    'forced_block_edge': [(0, 0), (1, 1), (0, 1)],
+}
+
+
+def setup(moves):
+    """
+    Creating the board with the position
+    moves: coordinates of moves from the start of the game
+    return: board and mark of the player to move
+    """
+    board = GameBoard()
+    for number, (row, col) in enumerate(moves):
+        board.add(row, col, 'X' if number % 2 == 0 else '0')
+    return board, 'X' if len(moves) % 2 == 0 else '0'
+
+
+def run_position(engine, moves, repeats=REPEATS, seed=SEED):
+    """
+    Measuring one bot on one position, every run starts a new bot
+    engine: class of the bot
+    moves: coordinates of moves from the start of the game
+    repeats: number of timed runs
+    seed: seed of the random generator
+    return: dictionary with the measurements
+    """
+    times = []
+    nodes = 0
+    for _ in range(repeats):
+        random.seed(seed)
+        board, mark = setup(moves)
+        bot = engine(board, mark)
+        start = perf_counter()
+        bot.choose_move()
+        times.append(perf_counter() - start)
+        nodes = getattr(bot, 'nodes', 0)
+
+    random.seed(seed)
+    board, mark = setup(moves)
+    bot = engine(board, mark)
+    tracemalloc.start()
+    move = bot.choose_move()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    traced_nodes = getattr(bot, 'nodes', 0)
+
+    seconds = sorted(times)[len(times) // 2]
+    return {'move': list(move), 'seconds_per_move': seconds,
+            'nodes': nodes,
+            'nodes_per_second': nodes / seconds if seconds else 0.0,
+            'peak_memory': peak,
+            'timed': getattr(bot, 'time_limit', None) is not None,
+            'seconds_per_node': seconds / nodes if nodes else 0.0,
+            'memory_per_node':
+                peak / traced_nodes if traced_nodes else 0.0}
+
+
+def run(repeats=REPEATS, seed=SEED):
+    """
+    Measuring all bots of Play.MODES on all positions
+    repeats: number of timed runs
+    seed: seed of the random generator
+    return: dictionary with results for every mode and position
+    """
+    results = {}
+    for mode, engine in sorted(Play.MODES.items()):
+        results[mode] = {name: run_position(engine, moves, repeats, seed)
+                         for name, moves in POSITIONS.items()}
+    return results
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """
+    Comparing the results with the baseline
+    results, baseline: results of run
+    tolerance: allowed relative growth of time and memory, per searched
+    position for the bots with a time limit
+    return: list with descriptions of regressions
+    """
+    regressions = []
+    for mode, positions in sorted(results.items()):
+        for name, result in sorted(positions.items()):
+            old = baseline.get(mode, {}).get(name)
+            if old is None:
+                continue
+            slacks = PER_NODE_SLACK if result.get('timed') else SLACK
+            for metric, slack in sorted(slacks.items()):
+                if metric not in old:
+                    continue
+                if result[metric] > old[metric] * (1 + tolerance) + slack:
+                    regressions.append('%s %s %s: %.6g > %.6g' % (
+                        mode, name, metric, result[metric], old[metric]))
+    return regressions
+
+
+def main():
+    """
+    Running the benchmark from the command line
+    """
+    parser = argparse.ArgumentParser(description='Benchmark of the bots')
+    parser.add_argument('--output', help='path to save the results')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE)
+    parser.add_argument('--repeats', type=int, default=REPEATS)
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='save the results as the new baseline')
+    args = parser.parse_args()
+
+    results = run(args.repeats)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance)
+    for regression in regressions:
+        print('Regression:', regression)
+    if regressions:
+        sys.exit(1)
+    print('No regressions')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,40 @@
 # Created as part of tic-tac-toe game
-# Including representation of the Board and the Position
+# Including representation of the Board as per-player bitboards
+# and the generalised board with k marks in a row
+
+# Cell (row, col) is stored in bit row * 3 + col
+CELLS = tuple((index // 3, index % 3) for index in range(9))
+FULL = (1 << 9) - 1
+
+# Winning lines, ordered by the index of their middle cell, so the
+# winner reported for a board matches a row-major scan of the cells
+WIN_MASKS = (
+    0b000000111,  # row 0
+    0b001001001,  # column 0
+    0b000111000,  # row 1
+    0b010010010,  # column 1
+    0b100010001,  # main diagonal
+    0b001010100,  # anti-diagonal
+    0b100100100,  # column 2
+    0b111000000,  # row 2
+)
+
+
+# Indexes of the winning lines through every cell
+LINES_OF_CELL = tuple(tuple(line for line, mask in enumerate(WIN_MASKS)
+                            if mask >> index & 1) for index in range(9))
+
+
+def is_win(bits):
+    """
+    Checking whether the marks contain a winning line
+    bits: bitboard of one player
+    return: True, if any winning line is completely filled
+    """
+    for mask in WIN_MASKS:
+        if bits & mask == mask:
+            return True
+    return False
 
 
 class GameBoard:
@@ -8,81 +43,223 @@ class GameBoard:
     """
 
     EMPTY = '-'
+    rows = cols = k = 3
+    size = 9
 
     def __init__(self):
-        self.board = []
-        for i in range(3):
-            row = []
-            for x in range(3):
-                row.append(Position(i, x, '-'))
-            self.board.append(row)
+        # One bitboard per player mark
+        self._bits = {}
+        self._occupied = 0
+        # Number of marks of every player on each winning line
+        self._line_counts = {}
+        # Mark which filled each winning line, or None
+        self._completed = [None] * len(WIN_MASKS)
+        self._filled = 0
+        self._status = None
         self.last = None
+        # Applied moves with the previous last move and status, to undo
+        self._history = []
+
+    def get(self, row, col):
+        """
+        row, col: position coordinates
+        return: data on the position
+        """
+        bit = 1 << (row * 3 + col)
+        for mark, bits in self._bits.items():
+            if bits & bit:
+                return mark
+        return self.EMPTY
+
+    def bits(self, mark):
+        """
+        mark: player mark in game
+        return: bitboard with all positions of the mark
+        """
+        return self._bits.get(mark, 0)
 
     def draw(self):
         """
         Drawing a game board
         """
         view = '  0 1 2\n'
-        for row in range(len(self.board)):
+        for row in range(3):
             view += str(row) + ' '
-            for col in range(len(self.board[0])):
-                view += self.board[row][col].data + ' '
+            for col in range(3):
+                view += self.get(row, col) + ' '
             view += '\n'
         print(view)
 
-    def _check(self, position):
+    def condition(self):
+        """
+        return: condition of the game board, for example: Draw!
+        """
+        return self._status
+
+    def _update_status(self):
+        """
+        Finding the condition after the winning line has been filled
+        """
+        for mark in self._completed:
+            if mark is not None:
+                self._status = mark + ' player won'
+                return
+        # Means that here are not empty places on the board
+        self._status = 'Draw!' if self._filled == 9 else None
+
+    def moves(self):
+        """
+        return: list with coordinates and data of all added moves in order
+        """
+        return [(CELLS[cell], data) for cell, data, _, _ in self._history]
+
+    def find_empty(self):
+        """
+        return: coordinates of all empty positions on the board
+        """
+        occupied = self._occupied
+        return [CELLS[index] for index in range(9)
+                if not occupied >> index & 1]
+
+    def add(self, row, col, data):
+        """
+        Changing data on position at board to given data
+        row, col: position coordinates
+        data: data you want to add
+        """
+        if not (0 <= row < 3 and 0 <= col < 3):
+            print('Adding on such position is not possible')
+            return
+        cell = row * 3 + col
+        bit = 1 << cell
+        if self._occupied & bit:
+            raise ValueError('The position is not empty')
+        self._bits[data] = self._bits.get(data, 0) | bit
+        self._occupied |= bit
+        self._history.append((cell, data, self.last, self._status))
+        self.last = [(row, col), data]
+
+        self._filled += 1
+        counts = self._line_counts.get(data)
+        if counts is None:
+            counts = self._line_counts[data] = [0] * len(WIN_MASKS)
+        completed = False
+        for line in LINES_OF_CELL[cell]:
+            counts[line] += 1
+            if counts[line] == 3:
+                self._completed[line] = data
+                completed = True
+        if completed:
+            self._update_status()
+        elif self._filled == 9 and self._status is None:
+            self._status = 'Draw!'
+
+    def undo(self):
         """
-        Checking whether this position is part of the winning combination
-        position: instance Position
-        return: True, if this position is the part of winning combination
+        Reverting the last added move, including the last position
         """
-        row, col = position.row, position.col
+        if not self._history:
+            raise ValueError('There are no moves to undo')
+        cell, data, self.last, self._status = self._history.pop()
+        bit = 1 << cell
+        self._bits[data] ^= bit
+        self._occupied ^= bit
+
+        self._filled -= 1
+        counts = self._line_counts[data]
+        for line in LINES_OF_CELL[cell]:
+            if counts[line] == 3:
+                self._completed[line] = None
+            counts[line] -= 1
 
-        # Possible directions
-        possible = [[(0, 1), (0, -1)], [(1, 0), (-1, 0)],
-                    [(-1, 1), (1, -1)], [(1, 1), (-1, -1)]]
 
-        for var in possible:
-            try:
-                # Identifying row and column of neighbours
-                row1, col1 = row + var[0][1], col + var[0][0]
-                row2, col2 = row + var[1][1], col + var[1][0]
-                if not (row1 > -1 and row2 > -1 and col1 > -1 and col2 > -1):
-                    raise IndexError
-                first = self.board[row1][col1]
-                second = self.board[row2][col2]
-                if second.data == first.data == position.data:
-                    return True
-            except IndexError:
-                continue
+class GridBoard:
+    """
+    Represents rows x cols game board, where k marks in a row win
+    """
+
+    EMPTY = '-'
+
+    # Directions of the lines through one position
+    DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+    def __init__(self, rows=3, cols=3, k=3):
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        self.size = rows * cols
+        self._cells = {}
+        self._bits = {}
+        # Empty positions, find_empty gives them row by row
+        self._empty = {(row, col) for row in range(rows)
+                       for col in range(cols)}
+        self._winner = None
+        self.last = None
+        # Applied moves with the previous state, to undo them
+        self._history = []
+
+    def get(self, row, col):
+        """
+        row, col: position coordinates
+        return: data on the position
+        """
+        return self._cells.get((row, col), self.EMPTY)
+
+    def bits(self, mark):
+        """
+        mark: player mark in game
+        return: bitboard with all positions of the mark
+        """
+        return self._bits.get(mark, 0)
+
+    def draw(self):
+        """
+        Drawing a game board
+        """
+        width = len(str(max(self.rows, self.cols) - 1))
+        view = ' ' * (width + 1)
+        view += ' '.join(str(col).ljust(width) for col in range(self.cols))
+        view += '\n'
+        for row in range(self.rows):
+            view += str(row).ljust(width) + ' '
+            for col in range(self.cols):
+                view += self.get(row, col).ljust(width) + ' '
+            view += '\n'
+        print(view)
+
+    def _wins(self, row, col, data):
+        """
+        Checking the lines through the position only
+        row, col: position coordinates
+        data: mark on the position
+        return: True, if the position completes k marks in a row
+        """
+        cells = self._cells
+        for d_row, d_col in self.DIRECTIONS:
+            count = 1
+            for sign in (1, -1):
+                r, c = row + sign * d_row, col + sign * d_col
+                while cells.get((r, c)) == data:
+                    count += 1
+                    r, c = r + sign * d_row, c + sign * d_col
+            if count >= self.k:
+                return True
+        return False
 
     def condition(self):
         """
         return: condition of the game board, for example: Draw!
         """
-        filled = 0
-        for row in range(len(self.board)):
-            for col in range(len(self.board[0])):
-                current = self.board[row][col]
-                if current.data is not '-':
-                    filled += 1
-                    if self._check(current):
-                        return current.data + ' player won'
-
-        # Means that here are not empty places on the board
-        if filled == 9:
+        if self._winner is not None:
+            return self._winner + ' player won'
+        if not self._empty:
             return 'Draw!'
 
     def find_empty(self):
         """
         return: coordinates of all empty positions on the board
         """
-        empty = []
-        for row in range(len(self.board)):
-            for column in range(len(self.board[0])):
-                if self.board[row][column].data is self.EMPTY:
-                    empty.append((row, column))
-        return empty
+        return sorted(self._empty)
 
     def add(self, row, col, data):
         """
@@ -90,25 +267,32 @@ class GameBoard:
         row, col: position coordinates
         data: data you want to add
         """
-        try:
-            if self.board[row][col].data is self.EMPTY:
-                self.board[row][col].data = data
-                self.last = [(row, col), data]
-            else:
-                raise ValueError('The position is not empty')
-        except IndexError:
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
             print('Adding on such position is not possible')
+            return
+        if (row, col) not in self._empty:
+            raise ValueError('The position is not empty')
+        self._empty.remove((row, col))
+        self._cells[(row, col)] = data
+        self._bits[data] = self._bits.get(data, 0) | \
+            1 << (row * self.cols + col)
+        self._history.append((self.last, self._winner))
+        self.last = [(row, col), data]
+        if self._winner is None and self._wins(row, col, data):
+            self._winner = data
 
+    def undo(self):
+        """
+        Reverting the last added move, including the last position
+        """
+        if not self._history:
+            raise ValueError('There are no moves to undo')
+        (row, col), data = self.last
+        self.last, self._winner = self._history.pop()
+        del self._cells[(row, col)]
+        self._bits[data] ^= 1 << (row * self.cols + col)
+        self._empty.add((row, col))
 
-class Position:
-    """
-    Representing position on the game board
-    """
-
-    def __init__(self, row, col, data):
-        self.row = row
-        self.col = col
-        self.data = data
 
 if __name__ == '__main__':
     m = GameBoard()
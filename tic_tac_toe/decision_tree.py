@@ -1,5 +1,10 @@
 # The part of tic-tac-toe game
 # Created to process decision making for bot-player
+# Includes the eager Tree and the compact ArrayTree
+
+from array import array
+import struct
+import sys
 
 
 class Tree:
@@ -37,3 +42,148 @@ class Tree:
         return: root value
         """
         return self._root
+
+
+class ArrayTree:
+    """
+    Represents a Tree Data Structure kept in parallel typed arrays,
+    every node is a view with the index of the position in the arrays.
+    States are unsigned 64-bit numbers
+    """
+
+    NONE = -1
+    MAGIC = b'TTTREE1\n'
+    # Type codes of the arrays, in the order they are saved
+    ARRAYS = (('parent', 'i'), ('first', 'i'), ('last', 'i'),
+              ('sibling', 'i'), ('state', 'Q'), ('score', 'd'))
+
+    def __init__(self, root=0, _arrays=None, _index=0):
+        """
+        root: packed board state of the root
+        """
+        if _arrays is None:
+            self._arrays = {name: array(code) for name, code in self.ARRAYS}
+            self._index = self._append(root, self.NONE)
+        else:
+            self._arrays = _arrays
+            self._index = _index
+
+    def _append(self, state, parent):
+        """
+        Adding a new node to the arrays
+        state: packed board state
+        parent: index of the parent
+        return: index of the new node
+        """
+        if not 0 <= state < 1 << 64:
+            raise ValueError('State of the node does not fit in 64 bits')
+        arrays = self._arrays
+        index = len(arrays['state'])
+        arrays['parent'].append(parent)
+        arrays['first'].append(self.NONE)
+        arrays['last'].append(self.NONE)
+        arrays['sibling'].append(self.NONE)
+        arrays['state'].append(state)
+        arrays['score'].append(0.0)
+        return index
+
+    def __len__(self):
+        """
+        return: number of nodes in the whole tree
+        """
+        return len(self._arrays['state'])
+
+    def add(self, value):
+        """
+        Adding an element to the children
+        value: packed board state
+        return: the new child
+        """
+        arrays = self._arrays
+        index = self._append(value, self._index)
+        last = arrays['last'][self._index]
+        if last == self.NONE:
+            arrays['first'][self._index] = index
+        else:
+            arrays['sibling'][last] = index
+        arrays['last'][self._index] = index
+        return ArrayTree(_arrays=arrays, _index=index)
+
+    def __iter__(self):
+        """
+        Iterating elements in self.children
+        return: child one by one
+        """
+        arrays = self._arrays
+        index = arrays['first'][self._index]
+        while index != self.NONE:
+            yield ArrayTree(_arrays=arrays, _index=index)
+            index = arrays['sibling'][index]
+
+    def get_children(self):
+        """
+        return: list with children
+        """
+        return list(self)
+
+    def get_root(self):
+        """
+        return: root value
+        """
+        return self._arrays['state'][self._index]
+
+    def get_parent(self):
+        """
+        return: parent tree or None for the root of the whole tree
+        """
+        parent = self._arrays['parent'][self._index]
+        if parent == self.NONE:
+            return None
+        return ArrayTree(_arrays=self._arrays, _index=parent)
+
+    def get_score(self):
+        """
+        return: score of the node
+        """
+        return self._arrays['score'][self._index]
+
+    def set_score(self, score):
+        """
+        score: new score of the node
+        """
+        self._arrays['score'][self._index] = score
+
+    def dump(self, path):
+        """
+        Saving the whole tree to the file, numbers are little-endian
+        on every machine
+        path: path to file
+        """
+        with open(path, 'wb') as f:
+            f.write(self.MAGIC)
+            f.write(struct.pack('<I', len(self)))
+            for name, code in self.ARRAYS:
+                values = self._arrays[name]
+                if sys.byteorder == 'big':
+                    values = array(code, values)
+                    values.byteswap()
+                values.tofile(f)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loading the tree saved by dump
+        path: path to file
+        return: root of the tree
+        """
+        with open(path, 'rb') as f:
+            if f.read(len(cls.MAGIC)) != cls.MAGIC:
+                raise ValueError('The file is not a saved tree')
+            count = struct.unpack('<I', f.read(4))[0]
+            arrays = {}
+            for name, code in cls.ARRAYS:
+                arrays[name] = array(code)
+                arrays[name].fromfile(f, count)
+                if sys.byteorder == 'big':
+                    arrays[name].byteswap()
+        return cls(_arrays=arrays)
@@ -0,0 +1,49 @@
+# The part of tic-tac-toe game
+# Created to search the bot moves deeper and deeper till the deadline
+
+from time import perf_counter
+
+# Searches check the deadline once per CHECK_INTERVAL + 1 positions
+CHECK_INTERVAL = 63
+
+
+class SearchTimeout(Exception):
+    """
+    Raised by the search when the deadline has passed
+    """
+    pass
+
+
+def check_deadline(deadline):
+    """
+    deadline: value of perf_counter when the search must stop
+    """
+    if perf_counter() > deadline:
+        raise SearchTimeout
+
+
+def iterative_deepening(moves, evaluate, deadline, max_depth):
+    """
+    Searching with depth 1, 2, 3 and so on till the deadline, every
+    search tries the best moves of the previous one first
+    moves: coordinates of possible moves
+    evaluate: function of move and depth which returns the score of the
+    move and raises SearchTimeout when the deadline has passed
+    deadline: value of perf_counter when the search must stop
+    max_depth: depth which is enough to search till the end of the game
+    return: best move of the deepest completed search and its depth
+    """
+    best, completed = moves[0], 0
+    order = list(moves)
+    for depth in range(1, max_depth + 1):
+        try:
+            scores = [(evaluate(move, depth), move) for move in order]
+        except SearchTimeout:
+            break
+        # Sorting is stable, so equal moves keep the previous order
+        scores.sort(key=lambda item: item[0], reverse=True)
+        order = [move for score, move in scores]
+        best, completed = order[0], depth
+        if perf_counter() > deadline:
+            break
+    return best, completed
@@ -0,0 +1,124 @@
+# The part of tic-tac-toe game
+# Created to process Monte Carlo Tree Search for bot-player
+
+from math import log, sqrt
+from random import shuffle
+from time import perf_counter
+
+from tic_tac_toe.board import FULL, is_win
+
+# Exploration constant of the UCT formula
+EXPLORATION = sqrt(2)
+
+
+class Node:
+    """
+    Represents a position in the Monte Carlo search tree
+    """
+
+    __slots__ = ('mine', 'theirs', 'move', 'parent', 'children', 'untried',
+                 'visits', 'wins', 'terminal')
+
+    def __init__(self, mine, theirs, move=None, parent=None):
+        # Bitboards of the player to move and of the player who has moved
+        self.mine = mine
+        self.theirs = theirs
+        self.move = move
+        self.parent = parent
+        self.children = []
+        self.visits = 0
+        # Wins of the player who made the move into this position
+        self.wins = 0.0
+        self.terminal = is_win(theirs) or mine | theirs == FULL
+        occupied = mine | theirs
+        self.untried = [] if self.terminal else \
+            [index for index in range(9) if not occupied >> index & 1]
+        shuffle(self.untried)
+
+    def select(self):
+        """
+        Choosing the child with the best UCT value
+        return: child node
+        """
+        factor = EXPLORATION * sqrt(log(self.visits))
+        return max(self.children, key=lambda child:
+                   child.wins / child.visits +
+                   factor / sqrt(child.visits))
+
+    def expand(self):
+        """
+        Adding the child for one of untried moves
+        return: new child node
+        """
+        index = self.untried.pop()
+        child = Node(self.theirs, self.mine | 1 << index, index, self)
+        self.children.append(child)
+        return child
+
+    def find(self, mine, theirs, depth=2):
+        """
+        Finding the position among the descendants to reuse statistics
+        mine, theirs: bitboards of the position
+        depth: how deep to look for the position
+        return: node or None, if it is not in the tree
+        """
+        if self.mine == mine and self.theirs == theirs:
+            return self
+        if depth:
+            for child in self.children:
+                found = child.find(mine, theirs, depth - 1)
+                if found is not None:
+                    return found
+        return None
+
+
+def playout(mine, theirs):
+    """
+    Playing random moves till the end of the game
+    mine: bitboard of the player to move
+    theirs: bitboard of the player who has just moved
+    return: 1 if the player who has just moved wins, 0.5 for a draw,
+    0 if that player loses
+    """
+    if is_win(theirs):
+        return 1.0
+    occupied = mine | theirs
+    empty = [index for index in range(9) if not occupied >> index & 1]
+    shuffle(empty)
+    # The player to move is the opponent of the player who has just moved
+    opponent = True
+    for index in empty:
+        mine |= 1 << index
+        if is_win(mine):
+            return 0.0 if opponent else 1.0
+        mine, theirs = theirs, mine
+        opponent = not opponent
+    return 0.5
+
+
+def search(root, deadline):
+    """
+    Running iterations of the search till the deadline
+    root: node with the current position
+    deadline: value of perf_counter when the search must stop
+    return: number of completed iterations
+    """
+    iterations = 0
+    while perf_counter() < deadline:
+        node = root
+        # Selection
+        while not node.untried and node.children:
+            node = node.select()
+        # Expansion
+        if node.untried:
+            node = node.expand()
+        # Simulation
+        result = playout(node.mine, node.theirs)
+        # Backpropagation
+        while node is not None:
+            node.visits += 1
+            node.wins += result
+            result = 1.0 - result
+            node = node.parent
+        iterations += 1
+    return iterations
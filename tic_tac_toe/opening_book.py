@@ -0,0 +1,199 @@
+# The part of tic-tac-toe game
+# Created to generate and read the book of opening moves
+#
+# Positions are stored with the index from the solver, relative to the
+# player to move. Every record of the file is the index (2 bytes) and
+# the best move in the position (1 byte).
+#
+# Every bot has its own book with the moves of its own search, so the
+# book makes the opening faster, but does not change how the bot plays.
+# Books of bots, which score symmetric positions the same, are reduced
+# by the eight symmetries of the board and keep canonical positions only,
+# so such bot can get another move of the same value from the book.
+# AIUpgraded scores depend on the order of winning lines, so its book
+# keeps all positions.
+
+import os
+import struct
+
+from tic_tac_toe.board import CELLS, FULL, GameBoard, is_win
+from tic_tac_toe.solver import index
+
+BOOK_PATH = os.path.join(os.path.dirname(__file__), 'opening.book')
+UPGRADED_BOOK_PATH = os.path.join(os.path.dirname(__file__),
+                                  'opening_upgraded.book')
+MAGIC = b'TTTBOOK2'
+# Positions with less marks than PLIES are in the book
+PLIES = 5
+
+
+def _permutation(transform):
+    """
+    transform: function which moves (row, col) to the new coordinates
+    return: tuple, where the cell i goes to the cell tuple[i]
+    """
+    return tuple(row * 3 + col for row, col in
+                 (transform(row, col) for row, col in CELLS))
+
+
+# Rotations and reflections of the board
+SYMMETRIES = tuple(_permutation(transform) for transform in (
+    lambda r, c: (r, c),
+    lambda r, c: (c, 2 - r),
+    lambda r, c: (2 - r, 2 - c),
+    lambda r, c: (2 - c, r),
+    lambda r, c: (r, 2 - c),
+    lambda r, c: (2 - r, c),
+    lambda r, c: (c, r),
+    lambda r, c: (2 - c, 2 - r),
+))
+
+_books = {}
+
+
+def transform(bits, permutation):
+    """
+    bits: bitboard
+    permutation: one of SYMMETRIES
+    return: transformed bitboard
+    """
+    result = 0
+    for cell in range(9):
+        if bits >> cell & 1:
+            result |= 1 << permutation[cell]
+    return result
+
+
+def canonical(mine, theirs):
+    """
+    Finding the canonical form of the position
+    mine: bitboard of the player to move
+    theirs: bitboard of the opponent
+    return: index of the canonical position and its symmetry
+    """
+    return min((index(transform(mine, permutation),
+                      transform(theirs, permutation)), permutation)
+               for permutation in SYMMETRIES)
+
+
+def _key(mine, theirs, symmetric):
+    """
+    mine: bitboard of the player to move
+    theirs: bitboard of the opponent
+    symmetric: True if the book keeps canonical positions only
+    return: index of the position in the book and its symmetry
+    """
+    if symmetric:
+        return canonical(mine, theirs)
+    return index(mine, theirs), SYMMETRIES[0]
+
+
+def generate(plies=PLIES, engine=None, symmetric=True):
+    """
+    Finding the best moves of the engine for all opening positions
+    plies: positions with less marks are in the book
+    engine: class of the bot, which has the book argument, None for
+    AIPerfect
+    symmetric: True to keep canonical positions only
+    return: dictionary with index of position and best move
+    """
+    if engine is None:
+        # Players use the book, so they are imported only to generate it
+        from tic_tac_toe.players import AIPerfect
+        engine = AIPerfect
+    book = {}
+
+    def recurse(mine, theirs, marks):
+        """
+        Recursive function to visit all opening positions
+        mine: bitboard of the player to move
+        theirs: bitboard of the player who has just moved
+        marks: number of marks on the board
+        """
+        if marks >= plies or is_win(theirs) or mine | theirs == FULL:
+            return
+        key, permutation = _key(mine, theirs, symmetric)
+        if key in book:
+            return
+
+        # The engine plays 'X' from the position of the book
+        board = GameBoard()
+        for cell in range(9):
+            if transform(mine, permutation) >> cell & 1:
+                board.add(CELLS[cell][0], CELLS[cell][1], 'X')
+            elif transform(theirs, permutation) >> cell & 1:
+                board.add(CELLS[cell][0], CELLS[cell][1], '0')
+        row, col = engine(board, 'X', book=None).choose_move()
+        book[key] = row * 3 + col
+
+        occupied = mine | theirs
+        for cell in range(9):
+            if not occupied >> cell & 1:
+                recurse(theirs, mine | 1 << cell, marks + 1)
+
+    recurse(0, 0, 0)
+    return book
+
+
+def write_book(path=BOOK_PATH, plies=PLIES, engine=None, symmetric=True):
+    """
+    Generating the book and saving it to the file
+    path: path to file
+    plies: positions with less marks are in the book
+    engine: class of the bot, None for AIPerfect
+    symmetric: True to keep canonical positions only
+    """
+    book = generate(plies, engine, symmetric)
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<IB', len(book), symmetric))
+        for key in sorted(book):
+            f.write(struct.pack('<HB', key, book[key]))
+
+
+def load_book(path=BOOK_PATH):
+    """
+    Reading the book, every file is read once
+    path: path to file
+    return: dictionary with index of position and best move, and True
+    if the book keeps canonical positions only
+    """
+    if path not in _books:
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError('The file is not an opening book')
+            count, symmetric = struct.unpack('<IB', f.read(5))
+            moves = dict(struct.iter_unpack('<HB', f.read(3 * count)))
+            _books[path] = moves, bool(symmetric)
+    return _books[path]
+
+
+def fits(board):
+    """
+    board: game board
+    return: True if the book can be used on the board, it is made for
+    3 x 3 board with three in a row
+    """
+    return board.rows == 3 and board.cols == 3 and board.k == 3
+
+
+def lookup(book, mine, theirs):
+    """
+    Finding the move in the book
+    book: result of load_book
+    mine: bitboard of the player to move
+    theirs: bitboard of the opponent
+    return: coordinates of the move or None, if position is not in book
+    """
+    moves, symmetric = book
+    key, permutation = _key(mine, theirs, symmetric)
+    move = moves.get(key)
+    if move is None:
+        return None
+    return CELLS[permutation.index(move)]
+
+
+if __name__ == '__main__':
+    from tic_tac_toe.players import AIUpgraded
+    write_book()
+    write_book(UPGRADED_BOOK_PATH, engine=AIUpgraded, symmetric=False)
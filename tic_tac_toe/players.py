@@ -1,21 +1,66 @@
-from trees_easy.linked_binary_tree import LinkedBinaryTree
-from tic_tac_toe.decision_tree import Tree
+from tic_tac_toe.board import CELLS, FULL, is_win
+from tic_tac_toe.transposition import TranspositionTable
+from tic_tac_toe import mcts, opening_book, retrograde, solver, stats
+from tic_tac_toe.deepening import CHECK_INTERVAL, SearchTimeout, \
+    check_deadline, iterative_deepening
+from concurrent.futures import ProcessPoolExecutor
 from random import randrange
-from copy import deepcopy
+from time import perf_counter
 
 
 class ImpossibleMove(Exception):
     pass
 
 
+# Warm process pools, shared by all bots with the same number of workers
+_pools = {}
+# Bots living inside the worker processes, their tables stay warm
+_worker_bots = {}
+
+
+def _get_pool(workers):
+    """
+    workers: number of worker processes
+    return: persistent process pool
+    """
+    if workers not in _pools:
+        _pools[workers] = ProcessPoolExecutor(max_workers=workers)
+    return _pools[workers]
+
+
+def _play_scenario_worker(board, mark, human, settings, position):
+    """
+    Scoring one root move of AIUpgraded inside a worker process
+    board: copy of the game board
+    mark, human: marks of the bot and its opponent
+    settings: table size and depth limit of the bot
+    position: coordinates of the move
+    return: score of the move and number of searched positions
+    """
+    key = (mark, human, settings)
+    bot = _worker_bots.get(key)
+    if bot is None:
+        table_size, depth_limit = settings
+        bot = _worker_bots[key] = AIUpgraded(board, mark, table_size,
+                                             depth_limit=depth_limit)
+        bot.HUMAN = human
+    bot.game_board = board
+    bot.nodes = 0
+    return bot._play_scenario(position), bot.nodes
+
+
 class PlayerADT:
     """
     Representation of the abstract player
     """
+    HUMAN = 'X'
 
     def __init__(self, board, mark):
         self.mark = mark
         self.game_board = board
+        # Bots can play with any mark, the opponent takes the other one
+        if mark == self.HUMAN:
+            self.HUMAN = '0'
 
     def make_move(self):
         """
@@ -60,90 +105,120 @@ class AI(PlayerADT):
     """
     Representation of bot-instance player
     """
-    HUMAN = 'X'
+
+    def __init__(self, board, mark, hook=None, time_limit=None):
+        super().__init__(board, mark)
+        # Function to receive stats.MoveStats of every move, or None
+        self.hook = hook
+        # Number of positions searched during the last move
+        self.nodes = 0
+        # Seconds for one move, None to play both scenarios till the end
+        self.time_limit = time_limit
+        self._deadline = None
 
     def _score(self, board):
         """
         Created to estimate the decision
-        board: game board
+        board: game board, it is changed during the search and restored
         """
-        decision = LinkedBinaryTree(board)
 
-        def recurse(decision):
+        def recurse():
             """
             Recursive function to estimate the bunch of random variants
-            decision: binary tree structure
             return: the score of decision
             """
-            brd = decision.get_root_val()
-            condition = brd.condition()
+            self.nodes += 1
+            if self._deadline is not None and \
+                    not self.nodes & CHECK_INTERVAL:
+                check_deadline(self._deadline)
+            condition = board.condition()
 
             if not condition:
-                available = brd.find_empty()
+                available = board.find_empty()
 
                 person_move = available.pop(randrange(len(available)))
-                brd.add(person_move[0], person_move[1], self.HUMAN)
+                board.add(person_move[0], person_move[1], self.HUMAN)
 
                 if len(available) > 1:
                     m1 = available.pop(randrange(len(available)))
                     m2 = available.pop(randrange(len(available)))
-                    decision.insert_left(make_move(brd, m1, self.mark))
-                    decision.insert_right(make_move(brd, m2, self.mark))
-                    return recurse(decision.get_right_child()) + \
-                           recurse(decision.get_left_child())
+                    score = make_move(m2) + make_move(m1)
 
                 elif len(available) == 1:
                     m1 = available.pop(randrange(len(available)))
-                    decision.insert_left(make_move(brd, m1, self.mark))
-                    return recurse(decision.get_left_child())
+                    score = make_move(m1)
 
                 else:
-                    return recurse(decision)
+                    score = recurse()
+                board.undo()
+                return score
             elif condition.startswith('D'):
                 return 0
-            elif condition.startswith('X'):
+            elif condition.startswith(self.HUMAN):
                 return -1
             else:
                 return 1
 
-        def make_move(brd, pos, mark):
+        def make_move(pos):
             """
-            brd: game board with current condition
-            pos: coordinates of position to add a mark
-            mark: player mark in game
-            return: board with added mark
+            pos: coordinates of position to add a bot mark
+            return: the score of decision after the move
             """
-            brd = deepcopy(brd)
-            brd.add(pos[0], pos[1], mark)
-            return brd
+            board.add(pos[0], pos[1], self.mark)
+            score = recurse()
+            board.undo()
+            return score
 
-        return recurse(decision)
+        return recurse()
 
     def _play_scenario(self, position):
         """
         Playing a scenario of move
         position: coordinates of position of the first move
         """
-        brd = deepcopy(self.game_board)
+        brd = self.game_board
+        last = brd.last
         brd.add(position[0], position[1], self.mark)
-        decision = self._score(brd)
-        return decision
+        try:
+            return self._score(brd)
+        finally:
+            # Search stopped by the deadline leaves its moves on board
+            while brd.last is not last:
+                brd.undo()
+
+    def choose_move(self):
+        """
+        Choosing the move without making it
+        return: coordinates of the chosen move
+        """
+        self.nodes = 0
+        available = self.game_board.find_empty()
+        if len(available) == 1:
+            return available[0]
+        if self.time_limit is not None:
+            self._deadline = perf_counter() + self.time_limit
+        decisions = []
+        try:
+            for _ in range(2):
+                move = available.pop(randrange(len(available)))
+                decisions.append((self._play_scenario(move), move))
+        except SearchTimeout:
+            # The first move is played, if no scenario has finished
+            if not decisions:
+                return move
+        finally:
+            self._deadline = None
+        return max(decisions)[1]
 
     def turn(self):
         """
         Handle a bot-instance turn
         """
-        available = self.game_board.find_empty()
-        if len(available) > 1:
-            move1 = available.pop(randrange(len(available)))
-            decision1 = self._play_scenario(move1)
-            move2 = available.pop(randrange(len(available)))
-            decision2 = self._play_scenario(move2)
-            decision = max((decision1, move1), (decision2, move2))[1]
-            self.game_board.add(decision[0], decision[1], self.mark)
+        if self.hook is None:
+            move = self.choose_move()
         else:
-            move = available[0]
-            self.game_board.add(move[0], move[1], self.mark)
+            move = stats.measure(self)
+        self.game_board.add(move[0], move[1], self.mark)
 
 
 class AIUpgraded(AI):
@@ -151,65 +226,419 @@ class AIUpgraded(AI):
     Upgraded bot for tic-tac-toe game
     """
 
+    TABLE_SIZE = 100000
+
+    def __init__(self, board, mark, table_size=TABLE_SIZE, workers=None,
+                 depth_limit=None, node_budget=None, hook=None,
+                 book=opening_book.UPGRADED_BOOK_PATH, time_limit=None):
+        super().__init__(board, mark, hook)
+        # Opening book is consulted before the search, None to disable.
+        # It has the moves of the full search, so bots with limits of
+        # the search do not use it
+        if depth_limit is not None or node_budget is not None or \
+                time_limit is not None:
+            book = None
+        self.book = opening_book.load_book(book) if book else None
+        # Scores are kept between the scenarios and turns of one game
+        self.table = TranspositionTable(table_size)
+        # Number of processes to score the moves, None to score them here.
+        # The node budget is shared by all moves of one turn, so bots
+        # with the budget always score the moves here
+        self.workers = workers
+        # Limits of the search for one move, None means no limit
+        self.depth_limit = depth_limit
+        self.node_budget = node_budget
+        # ArrayTree to record the searched positions into, or None.
+        # Moves are scored here while tracing, even with workers, and
+        # boards with more than 32 cells do not fit in the trace
+        self.trace = None
+        # Seconds for one move, None to search without deepening
+        self.time_limit = time_limit
+        self._deadline = None
+        # Depth of the last completed deepening search
+        self.depth = None
+
+    def _key(self, board):
+        """
+        board: game board
+        return: compact encoding of the board
+        """
+        return board.bits(self.HUMAN) | board.bits(self.mark) << board.size
+
     def _score(self, board):
         """
         Created to estimate all decisions
-        board: copy of the current game board
+        board: current game board, it is changed during the search and
+        restored
         return: decision score
         """
-        decision = Tree(board)
+        return self._search(board, self.depth_limit)
 
-        def recurse(decision):
+    def _search(self, board, depth_limit):
+        """
+        Estimating all decisions not deeper than the limit
+        board: current game board, it is changed during the search and
+        restored
+        depth_limit: number of moves of both players to search or None
+        return: decision score
+        """
+        # Nodes of the trace on the path to the current position
+        path = [self.trace] if self.trace is not None else None
+
+        def recurse(depth):
             """
             Recursive function to estimate all possible scenarios
-            decision: tree data structure
-            return: the score of decision
+            depth: number of moves of both players left to search or None
+            return: the score of decision and True, if it is exact
+            """
+            self.nodes += 1
+            if self._deadline is not None and \
+                    not self.nodes & CHECK_INTERVAL:
+                check_deadline(self._deadline)
+            key = self._key(board)
+            if path is not None:
+                path.append(path[-1].add(key))
+            entry = self.table.get(key)
+            # Scores are kept with the depth of their search. Exact score
+            # is the same for any deeper search, other scores only for
+            # the same depth, so the score never depends on the table
+            if entry is not None and (entry[1] == depth or entry[2] and (
+                    depth is None or
+                    entry[1] is not None and entry[1] <= depth)):
+                score, exact = entry[0], entry[2]
+            else:
+                score, exact = evaluate(depth)
+                # Searches cut by the node budget depend on the order of
+                # moves, so they are not saved
+                if self.node_budget is None or \
+                        self.nodes <= self.node_budget:
+                    self.table.put(key, (score, depth, exact))
+            if path is not None:
+                path.pop().set_score(score)
+            return score, exact
+
+        def evaluate(depth):
+            """
+            Estimating the position which is not in the table yet
+            depth: number of moves of both players left to search or None
+            return: the score of decision and True, if it is exact
             """
-            brd = decision.get_root()
-            condition = brd.condition()
+            condition = board.condition()
 
             if not condition:
-                available = brd.find_empty()
+                if depth == 0 or self.node_budget is not None and \
+                        self.nodes > self.node_budget:
+                    # The position is not searched, it counts as a draw
+                    return 0, False
+                if depth is not None:
+                    depth -= 1
+
+                available = board.find_empty()
+                if len(available) == 1:
+                    # The last move of the game, bot can not answer
+                    board.add(available[0][0], available[0][1], self.HUMAN)
+                    result = recurse(depth)
+                    board.undo()
+                    return result
+
+                score, exact = 0, True
                 for i in available:
-                    decision.add(make_move(brd, i, self.HUMAN))
-
-                for decis in decision:
-                    brd_n = decis.get_root()
-                    available = brd_n.find_empty()
-                    if not available:
-                        return recurse(decis)
-                    for i in available:
-                        decis.add(make_move(brd_n, i, self.mark))
-                return sum([recurse(i) for x in decision for i in x])
+                    board.add(i[0], i[1], self.HUMAN)
+                    for answer in board.find_empty():
+                        board.add(answer[0], answer[1], self.mark)
+                        result = recurse(depth)
+                        score += result[0]
+                        exact = exact and result[1]
+                        board.undo()
+                    board.undo()
+                return score, exact
 
             elif condition.startswith('D'):
-                return 0
-            elif condition.startswith('X'):
-                return -2
+                return 0, True
+            elif condition.startswith(self.HUMAN):
+                return -2, True
             else:
-                return 1
+                return 1, True
 
-        def make_move(brd, pos, mark):
-            """
-            brd: game board with current condition
-            pos: coordinates of position to add a mark
-            mark: player mark in game
-            return: board with added mark
-            """
-            brd = deepcopy(brd)
-            brd.add(pos[0], pos[1], mark)
-            return brd
+        return recurse(depth_limit)[0]
+
+    def _score_move(self, position, depth):
+        """
+        Playing a scenario of move with limited depth
+        position: coordinates of position of the first move
+        depth: number of moves of both players to search after the move
+        return: decision score
+        """
+        board = self.game_board
+        last = board.last
+        board.add(position[0], position[1], self.mark)
+        try:
+            return self._search(board, depth)
+        finally:
+            # Search stopped by the deadline leaves its moves on board
+            while board.last is not last:
+                board.undo()
+
+    def choose_move(self):
+        """
+        Choosing the move without making it
+        return: coordinates of the best move
+        """
+        self.nodes = 0
+        if self.book is not None and opening_book.fits(self.game_board):
+            move = opening_book.lookup(self.book,
+                                       self.game_board.bits(self.mark),
+                                       self.game_board.bits(self.HUMAN))
+            if move is not None:
+                return move
+        available = self.game_board.find_empty()
+        if len(available) == self.game_board.size:
+            return available[-1]
+        if self.time_limit is not None:
+            self._deadline = perf_counter() + self.time_limit
+            try:
+                best, self.depth = iterative_deepening(
+                    available, self._score_move, self._deadline,
+                    len(available) // 2 + 1)
+            finally:
+                self._deadline = None
+            return best
+        if self.workers and self.workers > 1 and \
+                self.node_budget is None and self.trace is None:
+            return max(self._play_scenarios_parallel(available))[1]
+        decisions = []
+        for i in available:
+            score = self._play_scenario(i)
+            decisions.append((score, i))
+        return max(decisions)[1]
+
+    def _play_scenarios_parallel(self, available):
+        """
+        Scoring the moves in the process pool
+        available: coordinates of possible moves
+        return: list of (score, move) in the order of available
+        """
+        pool = _get_pool(self.workers)
+        settings = (self.table.size, self.depth_limit)
+        futures = [pool.submit(_play_scenario_worker, self.game_board,
+                               self.mark, self.HUMAN, settings, i)
+                   for i in available]
+        decisions = []
+        for future, i in zip(futures, available):
+            score, nodes = future.result()
+            self.nodes += nodes
+            decisions.append((score, i))
+        return decisions
+
+
+class AIPerfect(PlayerADT):
+    """
+    Bot which plays minimax-optimal moves using negamax search
+    with alpha-beta pruning
+    """
+
+    # Center first, then corners, then edges
+    ORDER = (4, 0, 2, 6, 8, 1, 3, 5, 7)
+
+    def __init__(self, board, mark, book=opening_book.BOOK_PATH,
+                 time_limit=None):
+        super().__init__(board, mark)
+        # Opening book is consulted before the search, None to disable,
+        # bots with the time limit do not use it
+        if time_limit is not None:
+            book = None
+        self.book = opening_book.load_book(book) if book else None
+        # Seconds for one move, None to search without deepening
+        self.time_limit = time_limit
+        self._deadline = None
+        # Depth of the last completed deepening search
+        self.depth = None
+        # Number of positions searched during the last move
+        self.nodes = 0
+
+    def _negamax(self, mine, theirs, empty, alpha, beta, depth):
+        """
+        Estimating the position for the player to move
+        mine: bitboard of the player to move
+        theirs: bitboard of the player who made the last move
+        empty: number of empty positions
+        alpha, beta: window of scores which are still interesting
+        depth: number of moves to search, positions deeper count as draw
+        return: score of position, faster wins have bigger scores
+        """
+        self.nodes += 1
+        if self._deadline is not None and not self.nodes & CHECK_INTERVAL:
+            check_deadline(self._deadline)
+        if is_win(theirs):
+            return -empty - 1
+        occupied = mine | theirs
+        if occupied == FULL or depth == 0:
+            return 0
+
+        best = -10
+        for index in self.ORDER:
+            bit = 1 << index
+            if occupied & bit:
+                continue
+            score = -self._negamax(theirs, mine | bit, empty - 1,
+                                   -beta, -alpha, depth - 1)
+            if score > best:
+                best = score
+                if best > alpha:
+                    alpha = best
+                    if alpha >= beta:
+                        break
+        return best
+
+    def choose_move(self):
+        """
+        Choosing the move without making it
+        return: coordinates of the best move
+        """
+        self.nodes = 0
+        mine = self.game_board.bits(self.mark)
+        theirs = self.game_board.bits(self.HUMAN)
+        if self.book is not None and opening_book.fits(self.game_board):
+            move = opening_book.lookup(self.book, mine, theirs)
+            if move is not None:
+                return move
+        occupied = mine | theirs
+        empty = 9 - bin(occupied).count('1')
+
+        if self.time_limit is not None:
+            moves = [index for index in self.ORDER
+                     if not occupied & 1 << index]
+
+            def evaluate(index, depth):
+                return -self._negamax(theirs, mine | 1 << index, empty - 1,
+                                      -10, 10, depth - 1)
+
+            self._deadline = perf_counter() + self.time_limit
+            try:
+                best, self.depth = iterative_deepening(
+                    moves, evaluate, self._deadline, empty)
+            finally:
+                self._deadline = None
+            return CELLS[best]
+
+        best, best_score = None, -10
+        for index in self.ORDER:
+            bit = 1 << index
+            if occupied & bit:
+                continue
+            score = -self._negamax(theirs, mine | bit, empty - 1,
+                                   -10, -best_score, empty)
+            if best is None or score > best_score:
+                best, best_score = index, score
+        return CELLS[best]
 
-        return recurse(decision)
+    def turn(self):
+        """
+        Handle a bot-instance turn
+        """
+        best = self.choose_move()
+        self.game_board.add(best[0], best[1], self.mark)
+
+
+class AIInstant(PlayerADT):
+    """
+    Bot which looks up the best move in the table of solved positions
+    """
+
+    def __init__(self, board, mark, path=solver.TABLE_PATH):
+        super().__init__(board, mark)
+        self.table = solver.load_table(path)
+
+    def choose_move(self):
+        """
+        Choosing the move without making it
+        return: coordinates of the best move
+        """
+        position = solver.index(self.game_board.bits(self.mark),
+                                self.game_board.bits(self.HUMAN))
+        return CELLS[self.table[position] & 0xF]
 
     def turn(self):
-        available = self.game_board.find_empty()
-        if len(available) > 8:
-            best = available[-1]
-        else:
-            decisions = []
-            for i in available:
-                score = self._play_scenario(i)
-                decisions.append((score, i))
-            best = max(decisions)[1]
+        """
+        Handle a bot-instance turn
+        """
+        best = self.choose_move()
+        self.game_board.add(best[0], best[1], self.mark)
+
+
+class AITablebase(PlayerADT):
+    """
+    Bot which looks up the best move in the table of retrograde solver,
+    so it plays perfectly on boards bigger than 3 x 3
+    """
+
+    def __init__(self, board, mark, path):
+        super().__init__(board, mark)
+        self.table = retrograde.load_table(path)
+        if board.size != self.table.size:
+            raise ValueError('The table is solved for %s x %s board' %
+                             (self.table.rows, self.table.cols))
+
+    def choose_move(self):
+        """
+        Choosing the move without making it
+        return: coordinates of the best move
+        """
+        cell = self.table.best_move(self.game_board.bits(self.mark),
+                                    self.game_board.bits(self.HUMAN))
+        return divmod(cell, self.table.cols)
+
+    def turn(self):
+        """
+        Handle a bot-instance turn
+        """
+        best = self.choose_move()
+        self.game_board.add(best[0], best[1], self.mark)
+
+
+class AIMonteCarlo(PlayerADT):
+    """
+    Bot which uses Monte Carlo Tree Search limited by time
+    """
+    TIME_LIMIT = 0.1
+
+    def __init__(self, board, mark, time_limit=TIME_LIMIT):
+        super().__init__(board, mark)
+        # Seconds for one move
+        self.time_limit = time_limit
+        # Search tree is kept between turns to reuse the statistics
+        self._root = None
+        # Number of iterations during the last move
+        self.nodes = 0
+
+    def choose_move(self):
+        """
+        Choosing the move without making it
+        return: coordinates of the best move
+        """
+        deadline = perf_counter() + self.time_limit
+        mine = self.game_board.bits(self.mark)
+        theirs = self.game_board.bits(self.HUMAN)
+
+        root = None
+        if self._root is not None:
+            root = self._root.find(mine, theirs)
+        if root is None:
+            root = mcts.Node(mine, theirs)
+        # Forgetting the part of the tree which is not reachable anymore
+        root.parent = None
+        self._root = root
+
+        self.nodes = mcts.search(root, deadline)
+        if root.children:
+            best = max(root.children, key=lambda child: child.visits)
+            return CELLS[best.move]
+        # There was no time even for one iteration
+        return CELLS[root.untried[-1]]
+
+    def turn(self):
+        """
+        Handle a bot-instance turn
+        """
+        best = self.choose_move()
         self.game_board.add(best[0], best[1], self.mark)
@@ -0,0 +1,176 @@
+# The part of tic-tac-toe game
+# Created to archive finished games and to analyse them later
+#
+# The file starts with MAGIC, then the records follow one by one.
+# Every record is a header byte and one byte per move (row * 3 + col).
+# The header keeps the number of moves in the low four bits, the result
+# in the next two bits and 1 in the seventh bit if '0' moved first.
+#
+# Example: python -m tic_tac_toe.records games.rec annotated.jsonl
+
+import argparse
+import json
+import os
+
+from tic_tac_toe import solver
+from tic_tac_toe.board import CELLS
+
+MAGIC = b'TTTREC1\n'
+MARKS = ('X', '0')
+DRAW, FIRST_WON, SECOND_WON, UNFINISHED = range(4)
+RESULTS = ('draw', 'first won', 'second won', 'unfinished')
+BATCH_SIZE = 10000
+VALUES = {solver.LOSS: 'loss', solver.DRAW: 'draw', solver.WIN: 'win'}
+
+
+def encode(board):
+    """
+    Packing the game into the record
+    board: game board with the moves of the game
+    return: bytes with the record
+    """
+    moves = board.moves()
+    first = moves[0][1] if moves else MARKS[0]
+    if first not in MARKS:
+        raise ValueError('Only games of X and 0 can be recorded')
+
+    condition = board.condition()
+    if condition is None:
+        result = UNFINISHED
+    elif condition.startswith('D'):
+        result = DRAW
+    elif condition.startswith(first):
+        result = FIRST_WON
+    else:
+        result = SECOND_WON
+
+    header = len(moves) | result << 4 | MARKS.index(first) << 6
+    return bytes([header] + [row * 3 + col for (row, col), _ in moves])
+
+
+class RecordWriter:
+    """
+    Represents a writer which appends games to the archive
+    """
+
+    def __init__(self, path):
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        if not new:
+            # Games are appended only to the archive
+            with open(path, 'rb') as f:
+                if f.read(len(MAGIC)) != MAGIC:
+                    raise ValueError('The file is not a game archive')
+        self._file = open(path, 'ab')
+        if new:
+            self._file.write(MAGIC)
+
+    def write(self, board):
+        """
+        Appending the game to the archive
+        board: game board with the moves of the game
+        """
+        self._file.write(encode(board))
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def read_records(path, batch_size=BATCH_SIZE):
+    """
+    Reading the archive batch by batch, so memory does not depend on
+    the size of the archive
+    path: path to the archive
+    batch_size: number of games in one batch
+    return: generator of lists with (first mark, result, list of cells)
+    """
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError('The file is not a game archive')
+        batch = []
+        while True:
+            header = f.read(1)
+            if not header:
+                break
+            header = header[0]
+            moves = f.read(header & 0xF)
+            if len(moves) != header & 0xF:
+                raise ValueError('The archive is truncated')
+            batch.append((MARKS[header >> 6 & 1], header >> 4 & 3,
+                          list(moves)))
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+def annotate_game(table, first, moves):
+    """
+    Replaying the game through the table of solved positions
+    table: table from solver.load_table
+    first: mark of the first player
+    moves: cells of the moves
+    return: list with evaluation of every move
+    """
+    mover, other = MARKS.index(first), 1 - MARKS.index(first)
+    bits = [0, 0]
+    annotations = []
+    for cell in moves:
+        before = table[solver.index(bits[mover], bits[other])]
+        bits[mover] |= 1 << cell
+        after = table[solver.index(bits[other], bits[mover])]
+        # Value after the move is for the opponent, so it is reversed
+        value = solver.WIN - (after >> 4)
+        annotations.append({
+            'mark': MARKS[mover], 'move': list(CELLS[cell]),
+            'best': list(CELLS[before & 0xF]),
+            'value_before': VALUES[before >> 4],
+            'value_after': VALUES[value],
+            'optimal': value == before >> 4})
+        mover, other = other, mover
+    return annotations
+
+
+def annotate(path, output, batch_size=BATCH_SIZE):
+    """
+    Annotating all games of the archive, one JSON line per game
+    path: path to the archive
+    output: path to the file with annotations
+    batch_size: number of games in one batch
+    return: number of annotated games
+    """
+    table = solver.load_table()
+    games = 0
+    with open(output, 'w') as f:
+        for batch in read_records(path, batch_size):
+            lines = []
+            for first, result, moves in batch:
+                lines.append(json.dumps({
+                    'game': games, 'first': first, 'result': RESULTS[result],
+                    'moves': annotate_game(table, first, moves)}))
+                games += 1
+            f.write('\n'.join(lines) + '\n')
+    return games
+
+
+def main():
+    """
+    Annotating the archive from the command line
+    """
+    parser = argparse.ArgumentParser(description='Annotate game archive')
+    parser.add_argument('archive')
+    parser.add_argument('output')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+    print(annotate(args.archive, args.output, args.batch_size),
+          'games annotated')
+
+
+if __name__ == '__main__':
+    main()
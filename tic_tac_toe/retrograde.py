@@ -0,0 +1,305 @@
+# The part of tic-tac-toe game
+# Created to solve boards bigger than 3 x 3 offline by retrograde analysis
+#
+# Every move adds a mark, so positions with s marks lead only to positions
+# with s + 1 marks. The solver starts from the full boards and goes back
+# layer by layer: values of a layer are propagated from the already solved
+# next layer, terminal positions are solved directly. Positions of a layer
+# are enumerated in chunks, so besides the tables nothing grows with the
+# board.
+#
+# Position is the index of the board in base 3, where the cell of the first
+# player is 1 and the cell of the second player is 2. Values for the player
+# to move are packed in 2 bits. Wins end in odd number of moves and losses
+# in even one, draws end on the full board, so only the half of distance
+# to the end of the game is kept in 4 bits. The tables take 3/4 byte for
+# every index, so boards have at most MAX_CELLS cells (about 290 MB).
+#
+# Example: python -m tic_tac_toe.retrograde 4 4 4 table4x4.bin
+
+import argparse
+import mmap
+import struct
+from itertools import combinations, islice
+
+UNKNOWN, LOSS, DRAW, WIN = range(4)
+MAGIC = b'TTTRETR2'
+HEADER = struct.Struct('<8sBBB')
+CHUNK_SIZE = 100000
+MAX_CELLS = 18
+
+_tables = {}
+
+
+def line_masks(rows, cols, k):
+    """
+    rows, cols: size of the board
+    k: number of marks in a row which win
+    return: list with bitboards of all winning lines
+    """
+    masks = []
+    for row in range(rows):
+        for col in range(cols):
+            for d_row, d_col in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                end_row = row + (k - 1) * d_row
+                end_col = col + (k - 1) * d_col
+                if 0 <= end_row < rows and 0 <= end_col < cols:
+                    mask = 0
+                    for step in range(k):
+                        mask |= 1 << ((row + step * d_row) * cols +
+                                      col + step * d_col)
+                    masks.append(mask)
+    return masks
+
+
+def _get(values, position):
+    return values[position >> 2] >> ((position & 3) << 1) & 3
+
+
+def _set(values, position, value):
+    values[position >> 2] |= value << ((position & 3) << 1)
+
+
+def _get_half(distances, position):
+    return distances[position >> 1] >> ((position & 1) << 2) & 0xF
+
+
+def _set_half(distances, position, half):
+    distances[position >> 1] |= half << ((position & 1) << 2)
+
+
+def _distance(value, half, marks, size):
+    """
+    Restoring the distance to the end of the game from its half
+    value: value of the position
+    half: half of the distance from the table
+    marks: number of marks on the board
+    size: number of cells on the board
+    return: number of moves till the end of the game
+    """
+    if value == DRAW:
+        return size - marks
+    return 2 * half + (value == WIN)
+
+
+class RetrogradeSolver:
+    """
+    Represents retrograde analysis of rows x cols board with k in a row
+    """
+
+    def __init__(self, rows=4, cols=4, k=4, chunk_size=CHUNK_SIZE):
+        if rows * cols > MAX_CELLS:
+            raise ValueError('Boards with more than %d cells do not fit in '
+                             'memory' % MAX_CELLS)
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        self.size = rows * cols
+        self.chunk_size = chunk_size
+        self.masks = line_masks(rows, cols, k)
+        self.powers = [3 ** cell for cell in range(self.size)]
+        count = 3 ** self.size
+        self.values = bytearray((count + 3) // 4)
+        self.distances = bytearray((count + 1) // 2)
+
+    def _wins(self, bits):
+        for mask in self.masks:
+            if bits & mask == mask:
+                return True
+        return False
+
+    def _layer(self, marks):
+        """
+        Generating all positions with the number of marks
+        marks: number of marks on the board
+        return: generator of (index, bitboard of first, bitboard of second)
+        """
+        powers = self.powers
+        for cells in combinations(range(self.size), marks):
+            for first in combinations(cells, (marks + 1) // 2):
+                first_bits = second_bits = 0
+                position = 0
+                for cell in cells:
+                    if cell in first:
+                        first_bits |= 1 << cell
+                        position += powers[cell]
+                    else:
+                        second_bits |= 1 << cell
+                        position += 2 * powers[cell]
+                yield position, first_bits, second_bits
+
+    def _solve_chunk(self, chunk, marks):
+        """
+        Solving the positions of one chunk of the layer
+        chunk: list of positions from _layer
+        marks: number of marks on the board
+        """
+        values, distances, powers = self.values, self.distances, self.powers
+        size = self.size
+        # Digit of the player to move and full board
+        digit = 1 if marks % 2 == 0 else 2
+        full = (1 << size) - 1
+        for position, first_bits, second_bits in chunk:
+            mine, theirs = (first_bits, second_bits) if digit == 1 else \
+                (second_bits, first_bits)
+            if self._wins(theirs):
+                _set(values, position, LOSS)
+                continue
+            occupied = mine | theirs
+            if occupied == full:
+                _set(values, position, DRAW)
+                continue
+
+            win = draw = loss = None
+            for cell in range(self.size):
+                if occupied >> cell & 1:
+                    continue
+                child = position + digit * powers[cell]
+                value = _get(values, child)
+                distance = _distance(value, _get_half(distances, child),
+                                     marks + 1, size)
+                if value == LOSS:
+                    if win is None or distance < win:
+                        win = distance
+                elif value == DRAW:
+                    if draw is None or distance > draw:
+                        draw = distance
+                elif loss is None or distance > loss:
+                    loss = distance
+
+            if win is not None:
+                _set(values, position, WIN)
+                _set_half(distances, position, (win + 1) >> 1)
+            elif draw is not None:
+                _set(values, position, DRAW)
+            else:
+                _set(values, position, LOSS)
+                _set_half(distances, position, (loss + 1) >> 1)
+
+    def solve(self, progress=None):
+        """
+        Solving all positions layer by layer from the full boards
+        progress: function to call with the number of solved layer
+        """
+        for marks in range(self.size, -1, -1):
+            layer = self._layer(marks)
+            while True:
+                chunk = list(islice(layer, self.chunk_size))
+                if not chunk:
+                    break
+                self._solve_chunk(chunk, marks)
+            if progress is not None:
+                progress(marks)
+
+    def write(self, path):
+        """
+        Saving the table to the file
+        path: path to file
+        """
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, self.rows, self.cols, self.k))
+            f.write(self.values)
+            f.write(self.distances)
+
+
+class RetrogradeTable:
+    """
+    Represents the solved table loaded by the game engine
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.rows, self.cols, self.k = \
+            HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC:
+            raise ValueError('The file is not a retrograde table')
+        self.size = self.rows * self.cols
+        count = 3 ** self.size
+        self._values = memoryview(self._data)[
+            HEADER.size:HEADER.size + (count + 3) // 4]
+        self._distances = memoryview(self._data)[
+            HEADER.size + (count + 3) // 4:]
+        self.powers = [3 ** cell for cell in range(self.size)]
+
+    def position(self, mine, theirs):
+        """
+        mine: bitboard of the player to move
+        theirs: bitboard of the opponent
+        return: index of the position
+        """
+        # The first player moves when both have the same number of marks
+        if bin(mine).count('1') == bin(theirs).count('1'):
+            first, second = mine, theirs
+        else:
+            first, second = theirs, mine
+        position = 0
+        for cell in range(self.size):
+            if first >> cell & 1:
+                position += self.powers[cell]
+            elif second >> cell & 1:
+                position += 2 * self.powers[cell]
+        return position
+
+    def lookup(self, mine, theirs):
+        """
+        mine: bitboard of the player to move
+        theirs: bitboard of the opponent
+        return: value for the player to move and distance to the end
+        """
+        position = self.position(mine, theirs)
+        value = _get(self._values, position)
+        return value, _distance(value, _get_half(self._distances, position),
+                                bin(mine | theirs).count('1'), self.size)
+
+    def best_move(self, mine, theirs):
+        """
+        Choosing the move which keeps the value of the position, wins as
+        fast and loses as slow as possible
+        mine: bitboard of the player to move
+        theirs: bitboard of the opponent
+        return: cell of the best move (row * cols + col) or None
+        """
+        occupied = mine | theirs
+        best, best_key = None, None
+        for cell in range(self.size):
+            if occupied >> cell & 1:
+                continue
+            value, distance = self.lookup(theirs, mine | 1 << cell)
+            # Value of child is for the opponent, the smallest is the best
+            key = (value, distance if value == LOSS else -distance)
+            if best_key is None or key < best_key:
+                best, best_key = cell, key
+        return best
+
+
+def load_table(path):
+    """
+    Opening the table, every file is opened once
+    path: path to file
+    return: RetrogradeTable
+    """
+    if path not in _tables:
+        _tables[path] = RetrogradeTable(path)
+    return _tables[path]
+
+
+def main():
+    """
+    Solving the board from the command line
+    """
+    parser = argparse.ArgumentParser(description='Retrograde solver')
+    parser.add_argument('rows', type=int)
+    parser.add_argument('cols', type=int)
+    parser.add_argument('k', type=int)
+    parser.add_argument('output')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    solver = RetrogradeSolver(args.rows, args.cols, args.k, args.chunk_size)
+    solver.solve(lambda marks: print('Layer', marks, 'solved'))
+    solver.write(args.output)
+
+
+if __name__ == '__main__':
+    main()
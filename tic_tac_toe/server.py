@@ -0,0 +1,248 @@
+# The part of tic-tac-toe game
+# Created to host many games against the bots at once
+#
+# Every connection is one session with a simple line protocol:
+#   NEW <mode> <user|bot>  start a new game, bot moves first with 'bot'
+#   MOVE <row> <col>       make a move, the bot answers immediately
+#   METRICS                get metrics of the server as JSON
+#   QUIT                   close the session
+# After NEW and MOVE the server answers with
+#   BOARD <nine cells row by row> <condition or 'playing'>
+# and with ERROR <message> if the command is not possible.
+#
+# Example: python -m tic_tac_toe.server --port 8765
+
+import argparse
+import asyncio
+import copy
+import json
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+
+from tic_tac_toe.board import GameBoard
+from tic_tac_toe.test_game import Play
+from tic_tac_toe.tournament import percentiles
+
+USER_MARK, BOT_MARK = 'X', '0'
+IDLE_TIMEOUT = 300.0
+MOVE_TIMEOUT = 10.0
+# Part of the move timeout given to the search, the rest is left to send
+# the move back before the timeout
+SEARCH_SHARE = 0.8
+# Number of the last bot moves used for latency metrics
+LATENCY_WINDOW = 10000
+
+# Bots living inside the executor, every thread has its own ones
+_local = threading.local()
+
+
+def bot_move(mode, board, mark, time_limit=None):
+    """
+    Choosing the bot move, runs inside the executor
+    mode: name of the bot in Play.MODES
+    board: copy of the game board
+    mark: mark of the bot
+    time_limit: seconds for the search of bots which have a time limit,
+    so the search stops by itself, None to keep their own limit
+    return: coordinates of the move
+    """
+    bots = getattr(_local, 'bots', None)
+    if bots is None:
+        bots = _local.bots = {}
+    bot = bots.get((mode, mark))
+    if bot is None:
+        bot = bots[(mode, mark)] = Play.MODES[mode](board, mark)
+    bot.game_board = board
+    if time_limit is not None and hasattr(bot, 'time_limit'):
+        if bot.time_limit is None or bot.time_limit > time_limit:
+            bot.time_limit = time_limit
+    return bot.choose_move()
+
+
+class Session:
+    """
+    Represents one game of the server
+    """
+
+    def __init__(self, mode):
+        self.mode = mode
+        self.board = GameBoard()
+
+    def state(self):
+        """
+        return: the line with the board and its condition
+        """
+        cells = ''.join(self.board.get(row, col)
+                        for row in range(3) for col in range(3))
+        return 'BOARD %s %s' % (cells, self.board.condition() or 'playing')
+
+
+class GameServer:
+    """
+    Represents asyncio server for many independent game sessions.
+    Bot moves run in the executor, only a process pool keeps slow searches
+    from stalling other sessions, threads of the default one share the GIL
+    """
+
+    def __init__(self, executor=None, idle_timeout=IDLE_TIMEOUT,
+                 move_timeout=MOVE_TIMEOUT):
+        self.executor = executor
+        self.idle_timeout = idle_timeout
+        self.move_timeout = move_timeout
+        self.active_sessions = 0
+        self.total_sessions = 0
+        self.moves = 0
+        self.timeouts = 0
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def metrics(self):
+        """
+        return: dictionary with the metrics of the server
+        """
+        result = {'active_sessions': self.active_sessions,
+                  'total_sessions': self.total_sessions,
+                  'bot_moves': self.moves, 'timeouts': self.timeouts}
+        for name, value in percentiles(self._latencies).items():
+            result['move_latency_%s_ms' % name] = value
+        return result
+
+    async def _bot_turn(self, session):
+        """
+        Making the bot move without blocking other sessions
+        session: game session
+        """
+        loop = asyncio.get_running_loop()
+        start = perf_counter()
+        # The search changes the board, so threads get a copy of it,
+        # processes get the pickled one anyway
+        board = session.board
+        if not isinstance(self.executor, ProcessPoolExecutor):
+            board = copy.deepcopy(board)
+        move = await asyncio.wait_for(
+            loop.run_in_executor(self.executor, bot_move, session.mode,
+                                 board, BOT_MARK,
+                                 self.move_timeout * SEARCH_SHARE),
+            self.move_timeout)
+        self._latencies.append(perf_counter() - start)
+        self.moves += 1
+        session.board.add(move[0], move[1], BOT_MARK)
+
+    async def _command(self, session, line):
+        """
+        Processing one command of the session
+        session: current game session or None
+        line: the command
+        return: game session and the answer
+        """
+        words = line.split()
+        if not words:
+            return session, 'ERROR empty command'
+        command = words[0].upper()
+
+        if command == 'METRICS':
+            return session, json.dumps(self.metrics())
+
+        if command == 'NEW':
+            if len(words) != 3 or words[1] not in Play.MODES or \
+                    words[2] not in ('user', 'bot'):
+                return session, 'ERROR usage: NEW <%s> <user|bot>' % \
+                    '|'.join(Play.MODES)
+            session = Session(words[1])
+            if words[2] == 'bot':
+                await self._bot_turn(session)
+            return session, session.state()
+
+        if command == 'MOVE':
+            if session is None:
+                return session, 'ERROR no game, use NEW'
+            try:
+                row, col = int(words[1]), int(words[2])
+            except (IndexError, ValueError):
+                return session, 'ERROR usage: MOVE <row> <col>'
+            if session.board.condition():
+                return session, 'ERROR the game is over'
+            if (row, col) not in session.board.find_empty():
+                return session, 'ERROR move is not possible'
+            session.board.add(row, col, USER_MARK)
+            if not session.board.condition():
+                await self._bot_turn(session)
+            return session, session.state()
+
+        return session, 'ERROR unknown command'
+
+    async def handle(self, reader, writer):
+        """
+        Serving one connection
+        reader, writer: streams of the connection
+        """
+        self.active_sessions += 1
+        self.total_sessions += 1
+        session = None
+        try:
+            while True:
+                try:
+                    line = await asyncio.wait_for(reader.readline(),
+                                                  self.idle_timeout)
+                except asyncio.TimeoutError:
+                    self.timeouts += 1
+                    writer.write(b'ERROR timeout\n')
+                    break
+                if not line:
+                    break
+                line = line.decode(errors='replace').strip()
+                if line.upper() == 'QUIT':
+                    break
+                try:
+                    session, answer = await self._command(session, line)
+                except asyncio.TimeoutError:
+                    self.timeouts += 1
+                    writer.write(b'ERROR bot move timeout\n')
+                    break
+                writer.write(answer.encode() + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.active_sessions -= 1
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=8765, path=None):
+        """
+        Running the server forever
+        host, port: TCP address to listen
+        path: path of Unix socket, it is used instead of TCP if given
+        """
+        if path:
+            server = await asyncio.start_unix_server(self.handle, path)
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    """
+    Running the server from the command line
+    """
+    parser = argparse.ArgumentParser(description='Tic-tac-toe game server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help='path of Unix socket')
+    parser.add_argument('--workers', type=int,
+                        help='number of processes for bot moves')
+    parser.add_argument('--idle-timeout', type=float, default=IDLE_TIMEOUT)
+    parser.add_argument('--move-timeout', type=float, default=MOVE_TIMEOUT)
+    args = parser.parse_args()
+
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        server = GameServer(executor, args.idle_timeout, args.move_timeout)
+        try:
+            asyncio.run(server.serve(args.host, args.port, args.unix))
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
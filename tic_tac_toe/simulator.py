@@ -0,0 +1,130 @@
+# The part of tic-tac-toe game
+# Created to simulate a big number of games at once with NumPy
+#
+# The games are kept as (N, 9) int8 array, where 0 is an empty position,
+# 1 is a mark of the first player and -1 is a mark of the second player
+
+import argparse
+import json
+
+import numpy as np
+
+from tic_tac_toe import solver
+
+# Positions of all winning lines
+LINES = np.array([[0, 1, 2], [3, 4, 5], [6, 7, 8],
+                  [0, 3, 6], [1, 4, 7], [2, 5, 8],
+                  [0, 4, 8], [2, 4, 6]])
+
+# Place value of every position in the index of the solved table
+POWERS = 3 ** np.arange(9)
+
+BATCH_SIZE = 100000
+
+
+def random_policy(boards, player, legal, rng):
+    """
+    Choosing random legal moves
+    boards: (N, 9) array with games
+    player: mark of the player to move, 1 or -1
+    legal: (N, 9) boolean array with possible moves
+    rng: numpy random generator
+    return: (N,) array with chosen positions
+    """
+    scores = rng.random(boards.shape)
+    scores[~legal] = -1
+    return scores.argmax(axis=1)
+
+
+def perfect_policy(boards, player, legal, rng):
+    """
+    Choosing the best moves from the table of solved positions
+    Arguments are the same as in random_policy
+    return: (N,) array with chosen positions
+    """
+    table = np.frombuffer(solver.load_table(), dtype=np.uint8)
+    codes = (boards == player) * 1 + (boards == -player) * 2
+    moves = (table[codes @ POWERS] & 0xF).astype(np.intp)
+    # Finished games have no move in the table, they are not changed
+    return np.where(moves < 9, moves, 0)
+
+
+POLICIES = {'random': random_policy, 'perfect': perfect_policy}
+
+
+def play_batch(size, first, second, rng):
+    """
+    Playing the batch of games till the end
+    size: number of games
+    first, second: policies of the players
+    rng: numpy random generator
+    return: (N,) int8 array, 1 or -1 for the winner and 0 for a draw
+    """
+    boards = np.zeros((size, 9), dtype=np.int8)
+    results = np.zeros(size, dtype=np.int8)
+    active = np.ones(size, dtype=bool)
+    games = np.arange(size)
+
+    for ply in range(9):
+        player = 1 if ply % 2 == 0 else -1
+        policy = first if player == 1 else second
+        legal = boards == 0
+        moves = policy(boards, player, legal, rng)
+        boards[games[active], moves[active]] = player
+
+        sums = boards[:, LINES].sum(axis=2, dtype=np.int8)
+        won = active & (sums == 3 * player).any(axis=1)
+        results[won] = player
+        active &= ~won
+        if not active.any():
+            break
+    return results
+
+
+def simulate(games, first=random_policy, second=random_policy, seed=None,
+             batch_size=BATCH_SIZE):
+    """
+    Simulating the games in batches
+    games: number of games
+    first, second: policies of the players
+    seed: seed of the random generator
+    batch_size: number of games played at once
+    return: dictionary with statistics for the first player
+    """
+    rng = np.random.default_rng(seed)
+    wins = losses = 0
+    left = games
+    while left > 0:
+        size = min(left, batch_size)
+        results = play_batch(size, first, second, rng)
+        wins += int((results == 1).sum())
+        losses += int((results == -1).sum())
+        left -= size
+
+    draws = games - wins - losses
+    # Empty simulation has no rates
+    total = games or 1
+    return {'games': games, 'wins': wins, 'draws': draws, 'losses': losses,
+            'win_rate': wins / total, 'draw_rate': draws / total,
+            'loss_rate': losses / total}
+
+
+def main():
+    """
+    Running the simulation from the command line
+    """
+    parser = argparse.ArgumentParser(description='Batch self-play simulator')
+    parser.add_argument('games', type=int)
+    parser.add_argument('--first', choices=POLICIES, default='random')
+    parser.add_argument('--second', choices=POLICIES, default='random')
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    stats = simulate(args.games, POLICIES[args.first], POLICIES[args.second],
+                     args.seed, args.batch_size)
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == '__main__':
+    main()
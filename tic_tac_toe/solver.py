@@ -0,0 +1,108 @@
+# The part of tic-tac-toe game
+# Created to solve every reachable position once and save the answers
+# in a compact binary table, which is looked up during the game
+#
+# Every position is stored in one byte at the index of the board in
+# base 3, where the cell of the player to move is 1 and the cell of the
+# opponent is 2. The low four bits of the byte hold the best move
+# (row * 3 + col), the next two bits hold the value of the position.
+
+import mmap
+import os
+
+from tic_tac_toe.board import FULL, is_win
+
+TABLE_PATH = os.path.join(os.path.dirname(__file__), 'positions.bin')
+TABLE_SIZE = 3 ** 9
+
+LOSS, DRAW, WIN = 0, 1, 2
+NO_MOVE = 0xF
+UNKNOWN = 0xFF
+
+# Base 3 value of every bitboard, where each set bit is a digit 1
+TERNARY = tuple(sum(3 ** index for index in range(9) if bits >> index & 1)
+                for bits in range(1 << 9))
+
+# Center first, then corners, then edges
+ORDER = (4, 0, 2, 6, 8, 1, 3, 5, 7)
+
+_tables = {}
+
+
+def index(mine, theirs):
+    """
+    mine: bitboard of the player to move
+    theirs: bitboard of the opponent
+    return: index of the position in the table
+    """
+    return TERNARY[mine] + 2 * TERNARY[theirs]
+
+
+def solve():
+    """
+    Solving every position reachable from the empty board
+    return: bytearray with the table
+    """
+    table = bytearray([UNKNOWN]) * TABLE_SIZE
+
+    def recurse(mine, theirs, empty):
+        """
+        Recursive function to solve the position
+        mine: bitboard of the player to move
+        theirs: bitboard of the player who made the last move
+        empty: number of empty positions
+        return: score of position, faster wins have bigger scores
+        """
+        if is_win(theirs):
+            table[index(mine, theirs)] = LOSS << 4 | NO_MOVE
+            return -empty - 1
+        occupied = mine | theirs
+        if occupied == FULL:
+            table[index(mine, theirs)] = DRAW << 4 | NO_MOVE
+            return 0
+
+        best, best_score = None, -10
+        for cell in ORDER:
+            bit = 1 << cell
+            if occupied & bit:
+                continue
+            score = -recurse(theirs, mine | bit, empty - 1)
+            if score > best_score:
+                best, best_score = cell, score
+
+        if best_score > 0:
+            value = WIN
+        elif best_score < 0:
+            value = LOSS
+        else:
+            value = DRAW
+        table[index(mine, theirs)] = value << 4 | best
+        return best_score
+
+    recurse(0, 0, 9)
+    return table
+
+
+def write_table(path=TABLE_PATH):
+    """
+    Generating the table and saving it to the file
+    path: path to file
+    """
+    with open(path, 'wb') as f:
+        f.write(solve())
+
+
+def load_table(path=TABLE_PATH):
+    """
+    Memory-mapping the table, every file is mapped once
+    path: path to file
+    return: read-only mapping with the table
+    """
+    if path not in _tables:
+        with open(path, 'rb') as f:
+            _tables[path] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return _tables[path]
+
+
+if __name__ == '__main__':
+    write_table()
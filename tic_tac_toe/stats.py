@@ -0,0 +1,132 @@
+# The part of tic-tac-toe game
+# Created to collect statistics about the search of bot-players
+#
+# Bots with a hook choose their move on a CountingBoard and pass the
+# MoveStats record of the move to the hook. Bots without a hook work
+# on the game board directly, so nothing is counted.
+
+from time import perf_counter
+
+
+class MoveStats:
+    """
+    Represents statistics of one bot move
+    """
+
+    FIELDS = ('player', 'mark', 'move', 'nodes', 'boards_copied',
+              'condition_calls', 'cache_hits', 'max_depth', 'wall_time')
+
+    def __init__(self, **fields):
+        for name in self.FIELDS:
+            setattr(self, name, fields.get(name))
+
+    def as_dict(self):
+        """
+        return: dictionary with all fields of the record
+        """
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def __repr__(self):
+        return 'MoveStats(%s)' % ', '.join(
+            '%s=%r' % item for item in self.as_dict().items())
+
+
+def _board_copy(board):
+    """
+    board: copied or unpickled game board
+    return: the same board, which replaces the wrapper in the copy
+    """
+    return board
+
+
+class CountingBoard:
+    """
+    Represents a game board wrapper which counts its usage
+    """
+
+    def __init__(self, board):
+        self._board = board
+        self.condition_calls = 0
+        self.boards_copied = 0
+        # Number of moves added over the board and the deepest of them
+        self.depth = 0
+        self.max_depth = 0
+
+    def __getattr__(self, name):
+        return getattr(self._board, name)
+
+    def __reduce_ex__(self, protocol):
+        # Copies and pickles, for example for the process pool, are
+        # made of the real board
+        self.boards_copied += 1
+        return _board_copy, (self._board,)
+
+    def condition(self):
+        self.condition_calls += 1
+        return self._board.condition()
+
+    def add(self, row, col, data):
+        self._board.add(row, col, data)
+        self.depth += 1
+        if self.depth > self.max_depth:
+            self.max_depth = self.depth
+
+    def undo(self):
+        self._board.undo()
+        self.depth -= 1
+
+
+def measure(player):
+    """
+    Choosing the move of the bot and passing its statistics to the hook
+    player: bot with choose_move method and hook
+    return: coordinates of the chosen move
+    """
+    board = player.game_board
+    counting = CountingBoard(board)
+    table = getattr(player, 'table', None)
+    hits = table.hits if table is not None else 0
+
+    player.game_board = counting
+    start = perf_counter()
+    try:
+        move = player.choose_move()
+    finally:
+        player.game_board = board
+    wall_time = perf_counter() - start
+
+    player.hook(MoveStats(
+        player=type(player).__name__, mark=player.mark, move=move,
+        nodes=player.nodes, boards_copied=counting.boards_copied,
+        condition_calls=counting.condition_calls,
+        cache_hits=(table.hits if table is not None else 0) - hits,
+        max_depth=counting.max_depth, wall_time=wall_time))
+    return move
+
+
+class StatsLog:
+    """
+    Represents a hook which keeps the records and aggregates them
+    """
+
+    def __init__(self):
+        self.records = []
+
+    def __call__(self, record):
+        self.records.append(record)
+
+    def summary(self):
+        """
+        return: dictionary with totals and maximums over all records
+        """
+        summary = {'moves': len(self.records)}
+        for name in ('nodes', 'boards_copied', 'condition_calls',
+                     'cache_hits', 'wall_time'):
+            summary[name] = sum(getattr(record, name)
+                                for record in self.records)
+        summary['max_depth'] = max((record.max_depth
+                                    for record in self.records), default=0)
+        summary['max_wall_time'] = max((record.wall_time
+                                        for record in self.records),
+                                       default=0)
+        return summary
@@ -1,9 +1,11 @@
 # The main module of the tic-tac-toe game
 # Representing the tic-tac-toe game against the bot
-# Includes hard and easy modes
+# Includes easy, hard, perfect, instant and mcts modes
 
 from tic_tac_toe.board import GameBoard
-from tic_tac_toe.players import Player, AI, AIUpgraded
+from tic_tac_toe.records import RecordWriter
+from tic_tac_toe.players import Player, AI, AIUpgraded, AIPerfect, \
+    AIInstant, AIMonteCarlo
 
 
 class Play:
@@ -11,11 +13,14 @@ class Play:
     Created to run tic-tac-toe game
     """
 
-    MODES = {'hard': AIUpgraded, 'easy': AI}
+    MODES = {'hard': AIUpgraded, 'easy': AI, 'perfect': AIPerfect,
+             'instant': AIInstant, 'mcts': AIMonteCarlo}
 
-    def __init__(self):
+    def __init__(self, record_path=None):
         self.difficulty = self._get_level()
         self.board = GameBoard()
+        # Archive to append the finished game to, or None
+        self.record_path = record_path
 
     def _get_level(self):
         """
@@ -23,7 +28,8 @@ class Play:
         return: the level of difficulty
         """
         while True:
-            level = input('Enter the game difficulty, (easy, hard): ')
+            level = input('Enter the game difficulty, (%s): ' %
+                          ', '.join(self.MODES))
             if level in self.MODES.keys():
                 return level
 
@@ -66,6 +72,9 @@ class Play:
 
         print('Congratulation!')
         print(self.board.condition())
+        if self.record_path:
+            with RecordWriter(self.record_path) as writer:
+                writer.write(self.board)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,168 @@
+# The part of tic-tac-toe game
+# Created to play many games between two bots without the user
+#
+# Engines are classes of the players or other functions of board and mark
+# which create a player, for example functools.partial(AIUpgraded,
+# time_limit=0.05). They are sent to the processes, so they must be
+# picklable. The command line takes the names of Play.MODES.
+#
+# Example: python -m tic_tac_toe.tournament easy hard --games 1000
+
+import argparse
+import json
+import random
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+
+from tic_tac_toe.board import GameBoard
+from tic_tac_toe.test_game import Play
+
+MARKS = ('X', '0')
+CHUNK_SIZE = 50
+
+
+def play_game(first, second, board_factory=GameBoard):
+    """
+    Playing one game between two bots
+    first, second: engines of the players, the first one moves first
+    board_factory: function which creates an empty board
+    return: mark of the winner or None for a draw, and lists with
+    latencies of the moves of both players in seconds
+    """
+    board = board_factory()
+    players = (first(board, MARKS[0]), second(board, MARKS[1]))
+    latencies = ([], [])
+    turn = 0
+    while not board.condition():
+        start = perf_counter()
+        players[turn].make_move()
+        latencies[turn].append(perf_counter() - start)
+        turn = 1 - turn
+
+    condition = board.condition()
+    winner = None if condition.startswith('D') else board.last[1]
+    return winner, latencies[0], latencies[1]
+
+
+def play_games(engine_a, engine_b, start, count, seed,
+               board_factory=GameBoard):
+    """
+    Playing the chunk of games, engine_a moves first in even games
+    engine_a, engine_b: engines of the players
+    start: number of the first game in the chunk
+    count: number of games in the chunk
+    seed: seed of the random generator for the chunk
+    board_factory: function which creates an empty board
+    return: wins, draws and losses of engine_a, lists with latencies
+    of both engines
+    """
+    random.seed(seed)
+    wins = draws = losses = 0
+    latencies_a, latencies_b = [], []
+    for game in range(start, start + count):
+        a_first = game % 2 == 0
+        if a_first:
+            winner, moves_a, moves_b = play_game(engine_a, engine_b,
+                                                 board_factory)
+            a_mark = MARKS[0]
+        else:
+            winner, moves_b, moves_a = play_game(engine_b, engine_a,
+                                                 board_factory)
+            a_mark = MARKS[1]
+        latencies_a.extend(moves_a)
+        latencies_b.extend(moves_b)
+        if winner is None:
+            draws += 1
+        elif winner == a_mark:
+            wins += 1
+        else:
+            losses += 1
+    return wins, draws, losses, latencies_a, latencies_b
+
+
+def _name(engine):
+    """
+    engine: engine of the player
+    return: name of the engine for the results
+    """
+    for mode, player in Play.MODES.items():
+        if engine is player:
+            return mode
+    return getattr(engine, '__name__', repr(engine))
+
+
+def percentiles(values):
+    """
+    values: latencies in seconds
+    return: dictionary with latency percentiles in milliseconds
+    """
+    values = sorted(values)
+    if not values:
+        return {}
+    result = {}
+    for name, q in (('p50', 0.5), ('p90', 0.9), ('p99', 0.99)):
+        result[name] = values[min(len(values) - 1, int(q * len(values)))] \
+            * 1000
+    result['max'] = values[-1] * 1000
+    return result
+
+
+def run_match(engine_a, engine_b, games, workers=None, seed=0,
+              chunk_size=CHUNK_SIZE, board_factory=GameBoard):
+    """
+    Playing the match in a process pool
+    engine_a, engine_b: engines of the players
+    games: number of games, the first move alternates between engines
+    workers: number of processes, None for the number of processors
+    seed: seed of the random generators
+    chunk_size: number of games sent to the process at once
+    board_factory: picklable function which creates an empty board
+    return: dictionary with the results of the match
+    """
+    wins = draws = losses = 0
+    latencies_a, latencies_b = [], []
+    start = perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(play_games, engine_a, engine_b, first,
+                               min(chunk_size, games - first), seed + first,
+                               board_factory)
+                   for first in range(0, games, chunk_size)]
+        for future in futures:
+            chunk = future.result()
+            wins += chunk[0]
+            draws += chunk[1]
+            losses += chunk[2]
+            latencies_a.extend(chunk[3])
+            latencies_b.extend(chunk[4])
+    elapsed = perf_counter() - start
+
+    # Empty match has no rates
+    total = games or 1
+    return {'engines': [_name(engine_a), _name(engine_b)], 'games': games,
+            'seconds': elapsed, 'games_per_second': games / elapsed,
+            'wins': wins, 'draws': draws, 'losses': losses,
+            'win_rate': wins / total, 'draw_rate': draws / total,
+            'loss_rate': losses / total,
+            'latency_ms': [percentiles(latencies_a),
+                           percentiles(latencies_b)]}
+
+
+def main():
+    """
+    Running the match from the command line
+    """
+    parser = argparse.ArgumentParser(description='Engine-vs-engine match')
+    parser.add_argument('engine_a', choices=Play.MODES)
+    parser.add_argument('engine_b', choices=Play.MODES)
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    result = run_match(Play.MODES[args.engine_a], Play.MODES[args.engine_b],
+                       args.games, args.workers, args.seed)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
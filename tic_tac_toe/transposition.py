@@ -0,0 +1,52 @@
+# The part of tic-tac-toe game
+# Created to remember already estimated positions of the bot search
+
+from collections import OrderedDict
+
+
+class TranspositionTable:
+    """
+    Represents a bounded cache of position scores with LRU eviction
+    """
+
+    def __init__(self, size=100000):
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._scores = OrderedDict()
+
+    def __len__(self):
+        return len(self._scores)
+
+    def get(self, key):
+        """
+        Getting the score of the position
+        key: compact encoding of the board
+        return: cached score or None, if position was not estimated yet
+        """
+        score = self._scores.get(key)
+        if score is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._scores.move_to_end(key)
+        return score
+
+    def put(self, key, score):
+        """
+        Saving the score of the position
+        key: compact encoding of the board
+        score: score of the position
+        """
+        self._scores[key] = score
+        self._scores.move_to_end(key)
+        if len(self._scores) > self.size:
+            self._scores.popitem(last=False)
+
+    def clear(self):
+        """
+        Forgetting all positions and resetting the counters
+        """
+        self._scores.clear()
+        self.hits = 0
+        self.misses = 0
@@ -1,5 +1,6 @@
 # Created to estimate the time of algorithms working
 
+from binary_search_tree.linkedavl import LinkedAVL
 from binary_search_tree.linkedbst import LinkedBST
 from random import choice
 from time import time
@@ -82,6 +83,18 @@ def main():
         tree.find(wrd)
     print('Searching in balanced tree: ', time() - start, 'sec')
 
+    # Estimating loading time of balanced tree from sorted words
+    start = time()
+    LinkedBST.bulkLoad(lst)
+    print('Bulk loading balanced tree: ', time() - start, 'sec')
+
+    # Estimating searching time in AVL tree filled in sorted order
+    avl = LinkedAVL(lst)
+    start = time()
+    for wrd in needed:
+        avl.find(wrd)
+    print('Searching in AVL tree: ', time() - start, 'sec')
+
 
 if __name__ == '__main__':
     main()